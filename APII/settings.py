@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,9 +51,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',  # أولًا حتى يقيس كل السلسلة (يعمل مع PERFORMANCE_MONITORING فقط)
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.StaticFilesMiddleware',  # WhiteNoise بنسخة async حتى لا يعيد الواجهات async إلى خيوط
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -93,17 +97,20 @@ WSGI_APPLICATION = 'APII.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# ✅ قاعدة البيانات من متغيرات البيئة: SQLite افتراضيًا أو PostgreSQL عبر DATABASE_URL
+# (التفاصيل والمتغيرات في APII/database.py)
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_env(BASE_DIR),
 }
 
+# كاتب واحد في كل عملية لمسارات الكتابة الكثيفة (save_chat_exchange) مع إعادة محاولة قصيرة
+SQLITE_WRITE_QUEUE = os.environ.get('SQLITE_WRITE_QUEUE') == '1'
+SQLITE_WRITE_RETRIES = 3
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',  # JWT مع لقطة المستخدم من الكاش
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # التأكد من أن المستخدم مسجل الدخول
@@ -126,6 +133,69 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# محرك تحليل المشاعر في الشات
+# الافتراضي: القوائم. لاستخدام نموذج محلي (يتطلب تثبيت torch):
+# SENTIMENT_BACKEND = {
+#     'BACKEND': 'core.utils.sentiment_backends.TransformerSentimentBackend',
+#     'OPTIONS': {
+#         'model': 'CAMeL-Lab/bert-base-arabic-camelbert-da-sentiment',  # أو مسار محلي للنموذج
+#         'max_batch_size': 16,       # أكبر دفعة تدخل النموذج
+#         'max_wait_ms': 10,          # أقصى انتظار لتجميع الدفعة
+#         'latency_budget_ms': 300,   # بعدها نرجع لتحليل القوائم
+#     },
+# }
+SENTIMENT_BACKEND = {
+    'BACKEND': 'core.utils.sentiment_backends.KeywordSentimentBackend',
+    'OPTIONS': {},
+}
+
+# توحيد الحروف (أإآ→ا، ى→ي، ة→ه، حذف التطويل) في النص وقوائم الكلمات قبل المطابقة.
+# يغيّر نتائج بعض الرسائل، لذلك بعد تفعيله: python manage.py rescore_sentiment
+SENTIMENT_ARABIC_FOLDING = False
+
+# مدة الجمود قبل إنهاء الجلسة (يطبقها expire_sessions وفحص SessionView)
+SESSION_IDLE_TIMEOUT = timedelta(minutes=30)
+
+# الكاش (locmem افتراضيًا لكل عملية)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # كتالوج الموارد (core.utils.resource_cache). مع عدة عمليات يفضّل كاش مشترك
+    # حتى يصل الإلغاء لكل العمليات فورًا، مثل:
+    # 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': BASE_DIR / '.cache' / 'resources',
+    # أو (يحتاج تثبيت redis):
+    # 'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1',
+    'resources': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'resources',
+    },
+    # لقطات المستخدم (core.authentication). LocMem يعني أن تعطيل المستخدم أو تغيير دوره
+    # يُحذف من كاش هذه العملية فقط؛ استخدم كاشًا مشتركًا كما في 'resources' مع عدة عمليات
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+    },
+}
+
+# أقصى مدة لصفحة الموارد في الكاش (الإلغاء يتم فورًا عند أي تعديل)
+RESOURCE_CACHE_TTL = 300
+
+# فهرس وسوم الموارد في ذاكرة كل عملية يُعاد بناؤه بعد هذه المدة (ثوانٍ) حتى يلحق بتعديلات
+# العمليات الأخرى عندما يكون كاش 'resources' هو LocMem (None = عند تغيّر الإصدار فقط)
+RESOURCE_INDEX_TTL = 60
+
+# مدة لقطة المستخدم في الكاش (CachedJWTAuthentication). مع LocMem وعدة عمليات هذه هي أطول
+# مدة قد تبقى فيها عملية أخرى تقبل مستخدمًا معطلًا، لذلك هي قصيرة عمدًا
+AUTH_USER_CACHE_TTL = 15
+
+# قياس الأداء لكل طلب (Server-Timing + admin/perf/)
+PERFORMANCE_MONITORING = False
+
+# إحصائيات لوحة الإدارة: صالحة لمدة TTL، وبعدها تُعرض القديمة حتى STALE_TTL أثناء إعادة الحساب
+PLATFORM_STATS_CACHE_TTL = 30
+PLATFORM_STATS_STALE_TTL = 300
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -18,7 +18,8 @@ from django.contrib import admin
 from django.urls import path,include
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # core أولاً: وإلا يلتقط catch-all الخاص بلوحة Django المسار admin/status/
     path('', include('core.urls')),
+    path('admin/', admin.site.urls),
 
 ]
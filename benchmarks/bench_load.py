@@ -0,0 +1,151 @@
+"""
+حمل من طرف إلى طرف على الواجهات باستخدام httpx (async) وتقرير JSON بالإنتاجية والنسب المئوية.
+
+يحتاج بيانات seed_data.py وخادمًا يعمل، مثلًا:
+
+    python benchmarks/seed_data.py --users 50
+    uvicorn APII.asgi:application --workers 4 &
+    python benchmarks/bench_load.py --base-url http://127.0.0.1:8000 --concurrency 32 --requests 2000
+    python benchmarks/bench_load.py --async-views ...   # نفس القراءات على نسخ async (للمقارنة)
+
+أو داخل نفس العملية بدون خادم (ASGITransport، مفيد للمقارنة بين الإصدارات على نفس الجهاز):
+
+    python benchmarks/bench_load.py --in-process --requests 500
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from common import BENCH_ADMIN, BENCH_PASSWORD, BENCH_USER_PREFIX, latency_summary, make_message, write_report
+
+SCENARIOS = ("send-message", "sessions", "mood-logs", "resources", "admin-stats")
+
+
+class Client:
+    """مستخدم قياس: توكن الوصول والجلسة النشطة."""
+
+    def __init__(self, token, session_id=None):
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.session_id = session_id
+
+
+async def login(http, username):
+    response = await http.post("/api/token/", json={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access"]
+
+
+async def prepare_clients(http, count):
+    async def prepare(index):
+        client = Client(await login(http, f"{BENCH_USER_PREFIX}{index}"))
+        # POST يرجع الجلسة النشطة أو ينشئ واحدة جديدة
+        response = await http.post("/sessions/", headers=client.headers)
+        response.raise_for_status()
+        client.session_id = response.json()["session_id"]
+        return client
+
+    return await asyncio.gather(*(prepare(index) for index in range(count)))
+
+
+def build_request(scenario, client, rng, messages, prefix=""):
+    # prefix="/async" يوجّه واجهات القراءة إلى نسخها async (async_views.py)
+    if scenario == "send-message":
+        return "POST", "/send-message/", {"session": client.session_id, "content": rng.choice(messages)}
+    if scenario == "sessions":
+        return "GET", f"{prefix}/sessions/", None
+    if scenario == "mood-logs":
+        return "GET", f"{prefix}/mood-logs/", None
+    if scenario == "resources":
+        return "GET", f"{prefix}/resources/?language={rng.choice(['ar', 'en'])}", None
+    if scenario == "admin-stats":
+        return "GET", "/admin/status/", None
+    raise ValueError(scenario)
+
+
+async def run_scenario(http, scenario, clients, admin, args, rng, messages):
+    latencies, statuses = [], Counter()
+    remaining = iter(range(args.requests))
+    prefix = "/async" if args.async_views else ""
+
+    async def worker():
+        for _ in remaining:
+            client = admin if scenario == "admin-stats" else rng.choice(clients)
+            method, url, body = build_request(scenario, client, rng, messages, prefix)
+            start = time.perf_counter()
+            try:
+                response = await http.request(method, url, json=body, headers=client.headers)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def make_transport(args):
+    if not args.in_process:
+        return None
+    from common import setup_django
+
+    setup_django()
+    from APII.asgi import application
+
+    return httpx.ASGITransport(app=application)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    transport = make_transport(args)
+    base_url = "http://testserver" if args.in_process else args.base_url
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=args.timeout) as http:
+        clients = await prepare_clients(http, args.users)
+        admin = Client(await login(http, BENCH_ADMIN))
+
+        messages = [make_message(rng) for _ in range(200)]
+        results = {}
+        for scenario in args.scenarios:
+            if args.warmup:
+                warmup = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+                await run_scenario(http, scenario, clients, admin, warmup, rng, messages)
+            results[scenario] = await run_scenario(http, scenario, clients, admin, args, rng, messages)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="تشغيل التطبيق داخل العملية عبر ASGITransport")
+    parser.add_argument("--async-views", action="store_true", help="سيناريوهات القراءة على مسارات async/")
+    parser.add_argument("--users", type=int, default=20, help="عدد مستخدمي bench_ المستخدمين في الحمل")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="عدد الطلبات لكل سيناريو")
+    parser.add_argument("--warmup", type=int, default=50, help="طلبات إحماء لا تدخل في النتائج")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="ملف JSON (الافتراضي: stdout)")
+    args = parser.parse_args()
+
+    write_report("load", args, asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+قياسات دقيقة داخل العملية: analyze_sentiment_scoring و normalize_text والـ serializers.
+
+الـ serializers تُقاس على صفوف من قاعدة البيانات (شغّل seed_data.py أولًا)،
+والقراءة من القاعدة خارج القياس حتى يظهر زمن التحويل فقط.
+كل ModelSerializer يُقاس مع نسخته Fast (على صفوف .values()) للمقارنة.
+
+    python benchmarks/bench_micro.py --repeat 5 --output micro.json
+"""
+import argparse
+import random
+import time
+
+from common import BENCH_USER_PREFIX, make_message, setup_django, write_report
+
+setup_django()
+
+from core.models import ChatMessage, MoodLog, Resource  # noqa: E402
+from core.serializers import (  # noqa: E402
+    ChatMessageHistorySerializer, FastChatMessageHistorySerializer, FastMoodLogSerializer, FastResourceSerializer,
+    MoodLogSerializer, ResourceSerializer,
+)
+from core.utils.sentiment_utils import (  # noqa: E402
+    analyze_sentiment_scoring, clear_score_cache, normalize_text, score_cache_stats,
+)
+
+# رسائل قصيرة شائعة تتكرر كثيرًا في الشات (تُخدم من كاش LRU بعد أول مرة)
+COMMON_MESSAGES = ["مرحبا", "السلام عليكم", "أهلا", "تمام", "الحمدلله", "شكرا", "أنا تعبان", "أنا قلقان", "ok", "hi"]
+
+
+def measure(func, items, repeat):
+    """أفضل زمن من repeat مرات، مقسومًا على عدد العناصر (µs لكل عنصر)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(items)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "items": len(items),
+        "best_total_ms": round(best * 1000, 3),
+        "per_item_us": round(best / len(items) * 1e6, 3) if items else None,
+        "items_per_second": round(len(items) / best) if items and best else None,
+    }
+
+
+def score_uncached(texts):
+    # الكاش يُفرغ قبل كل تكرار حتى لا تدخل الإصابات في قياس التحليل نفسه
+    clear_score_cache()
+    return [analyze_sentiment_scoring(text) for text in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=5000, help="عدد الرسائل الاصطناعية للتحليل")
+    parser.add_argument("--rows", type=int, default=2000, help="عدد الصفوف لكل serializer")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="ملف JSON (الافتراضي: stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [make_message(rng) for _ in range(args.texts)]
+    results = {
+        "normalize_text": measure(lambda items: [normalize_text(text) for text in items], texts, args.repeat),
+        "analyze_sentiment_scoring": measure(score_uncached, texts, args.repeat),
+        "analyze_sentiment_scoring_repeated": measure(
+            lambda items: [analyze_sentiment_scoring(text) for text in items],
+            [rng.choice(COMMON_MESSAGES) for _ in range(args.texts)], args.repeat,
+        ),
+    }
+    results["analyze_sentiment_scoring_repeated"]["cache"] = score_cache_stats()
+
+    querysets = [
+        (MoodLogSerializer, FastMoodLogSerializer, MoodLog.objects.filter(user__username__startswith=BENCH_USER_PREFIX)),
+        (ResourceSerializer, FastResourceSerializer, Resource.objects.all()),
+        (
+            ChatMessageHistorySerializer, FastChatMessageHistorySerializer,
+            ChatMessage.objects.filter(session__user__username__startswith=BENCH_USER_PREFIX),
+        ),
+    ]
+    for serializer_class, fast_class, queryset in querysets:
+        queryset = queryset.order_by("pk")[:args.rows]
+        results[serializer_class.__name__] = measure(
+            lambda items: serializer_class(items, many=True).data, list(queryset), args.repeat
+        )
+        results[fast_class.__name__] = measure(
+            lambda items: fast_class(items, many=True).data, list(queryset.values(*fast_class.fields())), args.repeat
+        )
+
+    write_report("micro", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+قياس زمن تحليل رسالة واحدة مع تكبير قوائم الكلمات.
+
+يقارن الفحص القديم (substring لكل كلمة) مع أوتوماتا Aho-Corasick.
+
+    python benchmarks/bench_sentiment.py
+    python benchmarks/bench_sentiment.py --sizes 400 2000 8000 --messages 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.utils.sentiment_utils import MOOD_LEXICONS, MOOD_WEIGHTS, MoodMatcher, normalize_text  # noqa: E402
+
+ARABIC_LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def grow_lexicons(size, rng):
+    """يوسّع القوائم الحقيقية بعبارات اصطناعية حتى يصل مجموعها إلى size."""
+    lexicons = {mood: list(words) for mood, words in MOOD_LEXICONS.items()}
+    moods = list(lexicons)
+    total = sum(len(words) for words in lexicons.values())
+    while total < size:
+        word = "".join(rng.choices(ARABIC_LETTERS, k=rng.randint(3, 7)))
+        if rng.random() < 0.3:
+            word += " " + "".join(rng.choices(ARABIC_LETTERS, k=rng.randint(3, 6)))
+        lexicons[rng.choice(moods)].append(word)
+        total += 1
+    return lexicons
+
+
+def make_messages(lexicons, count, rng):
+    vocabulary = [word for words in lexicons.values() for word in words]
+    messages = []
+    for _ in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(1, 3))
+        words += ["".join(rng.choices(ARABIC_LETTERS, k=rng.randint(2, 6))) for _ in range(rng.randint(5, 25))]
+        rng.shuffle(words)
+        messages.append(normalize_text(" ".join(words)))
+    return messages
+
+
+def scan_scores(lexicons, text):
+    scores = dict.fromkeys(lexicons, 0)
+    for mood, words in lexicons.items():
+        for word in words:
+            if word in text:
+                scores[mood] += MOOD_WEIGHTS[mood]
+    return scores
+
+
+def per_message_us(func, messages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in messages:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[400, 1000, 2000, 5000, 10000])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'phrases':>8} {'states':>8} {'scan µs':>10} {'automaton µs':>13} {'speedup':>8}")
+    for size in args.sizes:
+        lexicons = grow_lexicons(size, rng)
+        messages = make_messages(lexicons, args.messages, rng)
+        matcher = MoodMatcher(lexicons, MOOD_WEIGHTS)
+
+        for text in messages:
+            assert matcher.scores(text) == scan_scores(lexicons, text)
+
+        scan = per_message_us(lambda text: scan_scores(lexicons, text), messages, args.repeat)
+        automaton = per_message_us(matcher.scores, messages, args.repeat)
+        print(f"{size:>8} {len(matcher._automaton):>8} {scan:>10.1f} {automaton:>13.1f} {scan / automaton:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""أدوات مشتركة لسكربتات القياس: تهيئة Django، النسب المئوية، وكتابة تقرير JSON."""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+BENCH_USER_PREFIX = "bench_"
+BENCH_PASSWORD = "bench-pass-123"
+BENCH_ADMIN = "bench_admin"
+BENCH_LINK_PREFIX = "https://bench.daem.com/"
+FILLER = ["اليوم", "في", "العمل", "مع", "أصدقائي", "البيت", "كثيرا", "لا", "أعرف", "لماذا", "أحيانا", "الليل"]
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "APII.settings")
+    import django
+
+    django.setup()
+
+
+def make_message(rng):
+    """رسالة اصطناعية: كلمات عادية، وغالبًا كلمة من قوائم المشاعر."""
+    from core.utils.sentiment_utils import MOOD_LEXICONS  # لا يحتاج تهيئة Django
+
+    words = rng.choices(FILLER, k=rng.randint(3, 12))
+    if rng.random() < 0.8:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(MOOD_LEXICONS[rng.choice(list(MOOD_LEXICONS))]))
+    return " ".join(words)
+
+
+def percentile(sorted_values, percent):
+    """nearest-rank على قائمة مرتبة."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds):
+    values = sorted(value * 1000 for value in seconds)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(name, args, results, output=None):
+    """التقرير نفسه لكل السكربتات حتى يمكن مقارنة الإصدارات آليًا."""
+    report = {
+        "benchmark": name,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "args": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return report
@@ -0,0 +1,128 @@
+"""
+تعبئة قاعدة البيانات ببيانات اصطناعية للقياس (مستخدمون، جلسات، رسائل، سجلات مزاج، توصيات، موارد).
+
+كل المستخدمين يبدأ اسمهم بـ bench_ وكلمة مرورهم bench-pass-123، و bench_admin مستخدم إدارة.
+النتيجة ثابتة لنفس --seed.
+
+    python benchmarks/seed_data.py --users 200 --sessions 5 --messages 40 --resources 300
+    python benchmarks/seed_data.py --reset          # حذف بيانات القياس فقط
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from common import (
+    BENCH_ADMIN, BENCH_LINK_PREFIX, BENCH_PASSWORD, BENCH_USER_PREFIX, FILLER, make_message, setup_django, write_report,
+)
+
+setup_django()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from core.models import AISuggestion, ChatMessage, MoodLog, Resource, Session, UserProfile  # noqa: E402
+from core.utils.metrics_utils import rebuild_metrics  # noqa: E402
+from core.utils.resource_cache import invalidate_resource_catalogue  # noqa: E402
+from core.utils.resource_index import MOOD_TAGS  # noqa: E402
+from core.utils.sentiment_utils import analyze_sentiment_scoring, generate_support_reply  # noqa: E402
+
+BATCH_SIZE = 2000
+
+
+def reset():
+    with transaction.atomic():
+        # الحذف عبر ORM حتى تعمل الإشارات (العدادات، الكاش) والحذف المتسلسل
+        users = UserProfile.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()[0]
+        resources = Resource.objects.filter(link__startswith=BENCH_LINK_PREFIX).delete()[0]
+    return {"deleted_rows": users + resources}
+
+
+def seed(users, sessions, messages, resources, rng):
+    password = make_password(BENCH_PASSWORD)  # hash واحد للجميع، make_password بطيئة عمدًا
+    now = timezone.now()
+    counts = {}
+
+    with transaction.atomic():
+        UserProfile.objects.get_or_create(
+            username=BENCH_ADMIN,
+            defaults={"email": f"{BENCH_ADMIN}@bench.daem.com", "password": password, "role": "client", "is_staff": True},
+        )
+        profiles = UserProfile.objects.bulk_create([
+            UserProfile(
+                username=f"{BENCH_USER_PREFIX}{index}", email=f"{BENCH_USER_PREFIX}{index}@bench.daem.com",
+                password=password, role="client",
+            )
+            for index in range(users)
+        ], batch_size=BATCH_SIZE)
+        counts["users"] = len(profiles)
+
+        # جلسة نشطة واحدة فقط لكل مستخدم (القيد one_active_session_per_user) وهي الأخيرة
+        session_rows = []
+        for profile in profiles:
+            for index in range(sessions):
+                start = now - timedelta(days=sessions - index, minutes=rng.randint(0, 600))
+                last = index == sessions - 1
+                session_rows.append(Session(
+                    user=profile, is_ai_controlled=True, start_time=start, is_active=last,
+                    end_time=None if last else start + timedelta(minutes=30), is_completed=not last,
+                ))
+        session_rows = Session.objects.bulk_create(session_rows, batch_size=BATCH_SIZE)
+        counts["sessions"] = len(session_rows)
+
+        message_rows, mood_logs = [], []
+        for session in session_rows:
+            contents = [make_message(rng) for _ in range(messages)]
+            moods = [analyze_sentiment_scoring(content) for content in contents]
+            for content, (mood, _) in zip(contents, moods):
+                message_rows.append(ChatMessage(session=session, sender=session.user, content=content, sentiment=mood))
+                message_rows.append(ChatMessage(session=session, content=generate_support_reply(mood), is_ai=True, sentiment=mood))
+            if moods:
+                mood_logs.append(MoodLog(user=session.user, session=session, mood=moods[-1][0], sentiment_score=moods[0][1]))
+        counts["messages"] = len(ChatMessage.objects.bulk_create(message_rows, batch_size=BATCH_SIZE))
+
+        mood_logs = MoodLog.objects.bulk_create(mood_logs, batch_size=BATCH_SIZE)
+        counts["mood_logs"] = len(mood_logs)
+        counts["suggestions"] = len(AISuggestion.objects.bulk_create([
+            AISuggestion(user=log.user, mood_log=log, suggestion_text=generate_support_reply(log.mood), source_type="chat")
+            for log in mood_logs
+        ], batch_size=BATCH_SIZE))
+
+        tags = [tag for mood_tags in MOOD_TAGS.values() for tag in mood_tags]
+        counts["resources"] = len(Resource.objects.bulk_create([
+            Resource(
+                title=f"مورد {index} {rng.choice(FILLER)}", description=make_message(rng),
+                link=f"{BENCH_LINK_PREFIX}{index}", category=rng.choice(["article", "video", "exercise"]),
+                tags=", ".join(rng.sample(tags, k=rng.randint(1, 3))), language=rng.choice(["ar", "ar", "en"]),
+            )
+            for index in range(resources)
+        ], batch_size=BATCH_SIZE))
+
+        # bulk_create لا يرسل إشارات: نعيد حساب العدادات ونلغي كاش الموارد مرة واحدة
+        rebuild_metrics()
+        transaction.on_commit(invalidate_resource_catalogue)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=3, help="جلسات لكل مستخدم")
+    parser.add_argument("--messages", type=int, default=20, help="رسائل المستخدم في كل جلسة (مع رد AI لكل منها)")
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="حذف بيانات القياس فقط")
+    parser.add_argument("--output", help="ملف JSON (الافتراضي: stdout)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = reset()
+    if not args.reset:
+        results.update(seed(args.users, args.sessions, args.messages, args.resources, random.Random(args.seed)))
+    results["seconds"] = round(time.perf_counter() - start, 3)
+    write_report("seed_data", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import asyncio
+import functools
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import AISuggestion, MoodLog, Resource, Session
+from .pagination import KeysetPagination
+from .serializers import (
+    FastAISuggestionSerializer, FastMoodLogSerializer, FastResourceSerializer, UserRegistrationSerializer,
+)
+from .utils.chat_utils import save_chat_exchange
+from .utils.resource_cache import CATALOGUE_FILTERS, aget_cached_catalogue, catalogue_url
+from .utils.session_utils import arefresh_session_activity, is_session_idle
+from .utils.write_queue import DatabaseBusy
+from .utils.sentiment_backends import get_sentiment_backend
+from .utils.sentiment_utils import generate_support_reply
+from .views import (
+    AISuggestionListView, ChatMessageView, CurrentUserView, MoodLogListCreateView, ResourceListCreateView, SessionView,
+)
+
+logger = logging.getLogger(__name__)
+
+# هذه الواجهات async وتحتاج خادم ASGI (مثلاً: uvicorn APII.asgi:application)
+# حتى لا يحجز كل اتصال مفتوح خيطًا كاملًا.
+
+
+async def authenticate_request(request):
+    """نفس أصناف المصادقة المعرّفة في REST_FRAMEWORK، تُشغَّل خارج حلقة الأحداث."""
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = await sync_to_async(authentication_class().authenticate)(request)
+        except AuthenticationFailed:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+STREAM_START_GRACE = 1  # ثوانٍ
+
+# مهام حفظ الرسائل المتدفقة: مرجع قوي حتى تكتمل ولو انقطع العميل وأُلغي المولد
+_pending_exchanges = set()
+
+
+def _forget_exchange(task):
+    _pending_exchanges.discard(task)
+    exc = None if task.cancelled() else task.exception()
+    # Http404 و DatabaseBusy متوقعة ويصل خبرها للعميل في event: error
+    if exc is not None and not isinstance(exc, (Http404, DatabaseBusy)):
+        logger.error("فشل حفظ رسالة متدفقة", exc_info=exc)
+
+
+@csrf_exempt
+@require_POST
+async def stream_message(request):
+    """
+    نسخة متدفقة (Server-Sent Events) من send-message:
+    الترويسات وتعليق ": accepted" تُرسل فورًا، والتحليل ثم الحفظ يعملان في مهمة منفصلة
+    (asyncio.shield) فانقطاع العميل لا يضيّع الرسالة ولا الرد.
+    ثم event: mood، ثم event: chunk لأجزاء الرد، ثم event: done بعد الحفظ (أو event: error).
+    """
+    denied = await check_permissions(request, [IsAuthenticated, *ChatMessageView.permission_classes])
+    if denied is not None:
+        return denied
+
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({"message": "JSON غير صالح."}, status=400)
+    session_id = payload.get('session')
+    content = payload.get('content')
+    if not session_id or not content:
+        return JsonResponse({"message": "session_id و content مطلوبين."}, status=400)
+
+    # user و therapist لفحص IsSessionOwner | CanEditSession بدون استعلامات إضافية
+    session = await Session.objects.select_related('mood_log', 'user', 'therapist').filter(
+        id=session_id, is_active=True
+    ).afirst()
+    if session is None:
+        return JsonResponse({"detail": "No Session matches the given query."}, status=404)
+    denied = check_object_permissions(request, ChatMessageView.permission_classes, session)
+    if denied is not None:
+        return denied
+
+    async def analyze():
+        detected_mood, sentiment_score = await sync_to_async(
+            get_sentiment_backend().analyze, thread_sensitive=False
+        )(content)
+        return detected_mood, sentiment_score, generate_support_reply(detected_mood)
+
+    async def save(analysis):
+        detected_mood, sentiment_score, ai_response = await analysis
+        # الحفظ يشغل خيط الطلب (thread_sensitive) الذي تمر عليه أيضًا process_response للـ middleware،
+        # فننتظر بدء البث أولًا حتى لا يتأخر أول بايت، أو مهلة قصيرة إذا لم يبدأ (انقطع العميل)
+        try:
+            await asyncio.wait_for(stream_started.wait(), timeout=STREAM_START_GRACE)
+        except asyncio.TimeoutError:
+            pass
+        return await sync_to_async(save_chat_exchange)(
+            request.user, session, content, detected_mood, sentiment_score, ai_response
+        )
+
+    # تبدأ قبل إرجاع الرد، فلا تعتمد على قراءة العميل للبث
+    stream_started = asyncio.Event()
+    analysis = asyncio.ensure_future(analyze())
+    saved = asyncio.ensure_future(save(analysis))
+    _pending_exchanges.add(saved)
+    saved.add_done_callback(_forget_exchange)
+
+    async def events():
+        yield ': accepted\n\n'
+        stream_started.set()
+        detected_mood, sentiment_score, ai_response = await asyncio.shield(analysis)
+        yield sse_event('mood', {'detected_mood': detected_mood, 'sentiment_score': sentiment_score})
+        words = ai_response.split(' ')
+        for index, word in enumerate(words):
+            yield sse_event('chunk', {'text': word if index == len(words) - 1 else word + ' '})
+
+        try:
+            user_message, ai_message, mood_log, suggestion = await asyncio.shield(saved)
+        except Http404:
+            yield sse_event('error', {'message': 'انتهت الجلسة قبل حفظ الرسالة.', 'status': 404})
+            return
+        except DatabaseBusy as exc:
+            yield sse_event('error', {'message': str(exc.detail), 'status': exc.status_code, 'retry_after': exc.wait})
+            return
+        yield sse_event('done', {
+            'message': 'تم إرسال الرسالة بنجاح',
+            'user_message_id': user_message.id,
+            'ai_message_id': ai_message.id,
+            'suggestion': suggestion.suggestion_text,
+            'resource': suggestion.resource_id,
+            'detected_mood': detected_mood,
+        })
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # حتى لا يخزّن nginx الأحداث
+    return response
+
+
+# ✅ نسخ async من واجهات القراءة الأكثر استخدامًا (نفس الصلاحيات والمخرجات)
+
+def api_response(data, status=200):
+    # نفس ترميز JSONRenderer في DRF (التواريخ، UTF-8، بدون مسافات)
+    return JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+async def check_permissions(request, permission_classes):
+    """مثل APIView.check_permissions: يضبط request.user ويرجع رد 401/403 أو None."""
+    request.user = await authenticate_request(request) or AnonymousUser()
+    for permission_class in permission_classes:
+        if not permission_class().has_permission(request, None):
+            if request.user.is_authenticated:
+                return api_response({"detail": "You do not have permission to perform this action."}, status=403)
+            return api_response({"detail": "Authentication credentials were not provided."}, status=401)
+    return None
+
+
+def check_object_permissions(request, permission_classes, obj):
+    """مثل APIView.check_object_permissions، بعد check_permissions."""
+    for permission_class in permission_classes:
+        if not permission_class().has_object_permission(request, None, obj):
+            return api_response({"detail": "You do not have permission to perform this action."}, status=403)
+    return None
+
+
+def async_api_view(permission_classes=()):
+    """GET فقط، مع المصادقة والصلاحيات وتحويل APIException (مثل المؤشر غير الصالح) إلى JSON."""
+    def decorator(view):
+        @require_GET
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if permission_classes:
+                denied = await check_permissions(request, permission_classes)
+                if denied is not None:
+                    return denied
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return api_response({"detail": exc.detail}, status=exc.status_code)
+        return wrapper
+    return decorator
+
+
+async def paginate(request, queryset, serializer_class, view, base_url=None):
+    # view هو صنف الواجهة المتزامنة المقابلة، لنفس keyset_ordering
+    paginator = KeysetPagination()
+    paginator.base_url = base_url
+    queryset = queryset.values(*serializer_class.fields())
+    rows = await paginator.apaginate_queryset(queryset, Request(request), view=view)
+    return paginator.get_paginated_response(serializer_class(rows, many=True).data).data
+
+
+@async_api_view(CurrentUserView.permission_classes)
+async def current_user(request):
+    return api_response(UserRegistrationSerializer(request.user).data)
+
+
+@async_api_view(SessionView.permission_classes)
+async def active_session(request):
+    session = await Session.objects.filter(user=request.user, is_active=True).afirst()
+    if session is None:
+        return api_response({"message": "لا توجد جلسة نشطة حالياً."}, status=404)
+
+    now = timezone.now()
+    if is_session_idle(session, now):
+        session.is_active = False
+        session.end_time = now
+        await session.asave()
+        return api_response({"message": "تم إنهاء الجلسة بسبب الجمود."})
+
+    await arefresh_session_activity(session)
+    return api_response({
+        'session_id': session.id,
+        'start_time': session.start_time,
+        'is_ai_controlled': session.is_ai_controlled
+    })
+
+
+@async_api_view(MoodLogListCreateView.permission_classes)
+async def mood_log_list(request):
+    logs = MoodLog.objects.filter(user=request.user)
+    return api_response(await paginate(request, logs, FastMoodLogSerializer, MoodLogListCreateView))
+
+
+@async_api_view(AISuggestionListView.permission_classes)
+async def suggestion_list(request):
+    suggestions = AISuggestion.objects.filter(user=request.user)
+    return api_response(await paginate(request, suggestions, FastAISuggestionSerializer, AISuggestionListView))
+
+
+@async_api_view()
+async def resource_list(request):
+    # القراءة للجميع (AllowAny)، فلا حاجة للمصادقة
+    filters = {field: request.GET[field] for field in CATALOGUE_FILTERS if request.GET.get(field)}
+    url = catalogue_url(Request(request))
+
+    async def build_page():
+        return await paginate(
+            request, Resource.objects.filter(**filters), FastResourceSerializer, ResourceListCreateView, base_url=url
+        )
+
+    data, etag = await aget_cached_catalogue(url, build_page)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    response = api_response(data)
+    response['ETag'] = etag
+    return response
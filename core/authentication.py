@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# الحقول التي تحتاجها الصلاحيات والواجهات؛ أي حقل آخر يُحمّل من القاعدة عند أول استخدام (deferred)
+USER_SNAPSHOT_FIELDS = ('id', 'username', 'email', 'role', 'is_staff', 'is_superuser', 'is_active', 'is_verified')
+# غيّره عند تغيير الحقول أو شكل اللقطة حتى لا تُقرأ لقطات قديمة بعد النشر
+USER_SNAPSHOT_VERSION = 1
+USER_SNAPSHOT_CACHE_ALIAS = 'auth'
+
+
+def get_user_snapshot_cache():
+    alias = USER_SNAPSHOT_CACHE_ALIAS if USER_SNAPSHOT_CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def user_snapshot_key(user_id):
+    return f'auth-user:v{USER_SNAPSHOT_VERSION}:{user_id}'
+
+
+def invalidate_user_snapshot(user_id):
+    cache = get_user_snapshot_cache()
+    key = user_snapshot_key(user_id)
+    cache.delete(key)
+    # ومرة بعد الـ commit حتى لا يعيد طلب متزامن تخزين النسخة القديمة
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    مثل JWTAuthentication لكن المستخدم يُقرأ من لقطة في الكاش (لمدة AUTH_USER_CACHE_TTL)
+    بدل SELECT على UserProfile في كل طلب. اللقطة تُحذف عند أي حفظ أو حذف للمستخدم
+    (signals)، والتعديلات الجماعية بـ update() تظهر بعد انتهاء الـ TTL.
+    الحذف يصل فقط للكاش الذي تراه هذه العملية: إذا كان كاش 'auth' هو LocMem وعدة عمليات،
+    فالعمليات الأخرى قد تقبل مستخدمًا عُطّل أو تغيّر دوره حتى AUTH_USER_CACHE_TTL ثانية.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        fields = self.snapshot_fields()
+        cache = get_user_snapshot_cache()
+        key = user_snapshot_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            row = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*fields, 'password').first()
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            # نخزن بصمة كلمة المرور فقط (لفحص CHECK_REVOKE_TOKEN) وليس الـ hash نفسه
+            snapshot = (row[:-1], get_md5_hash_password(row[-1]))
+            cache.set(key, snapshot, timeout=getattr(settings, 'AUTH_USER_CACHE_TTL', 15))
+
+        values, password_md5 = snapshot
+        user = self.user_model.from_db(router.db_for_read(self.user_model), fields, values)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_md5:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def snapshot_fields(self):
+        # from_db يحتاج الحقول بنفس ترتيبها في النموذج
+        return [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in USER_SNAPSHOT_FIELDS
+        ]
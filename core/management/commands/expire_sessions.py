@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.utils.session_utils import expire_idle_sessions, get_session_idle_timeout
+
+
+class Command(BaseCommand):
+    help = (
+        "إنهاء الجلسات الخاملة (is_active و last_activity أقدم من SESSION_IDLE_TIMEOUT) بـ UPDATE واحد. "
+        "يمكن تشغيله من cron أو كعملية مستمرة مع --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="التشغيل بشكل مستمر.")
+        parser.add_argument('--interval', type=int, default=60, help="الثواني بين كل تشغيل مع --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            expired = expire_idle_sessions()
+            if expired or not options['loop']:
+                self.stdout.write(f"تم إنهاء {expired} جلسة خاملة (أكثر من {get_session_idle_timeout()}).")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
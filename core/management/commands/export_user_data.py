@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import UserProfile
+from core.utils.export_utils import EXPORT_CHUNK_SIZE, EXPORT_SECTIONS, iter_csv, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        "تصدير كل بيانات مستخدم (الجلسات، الرسائل، سجلات المزاج، التوصيات) بصيغة NDJSON أو CSV. "
+        "الصفوف تُكتب أثناء القراءة فتبقى الذاكرة ثابتة مهما كان حجم البيانات."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help="id المستخدم أو username.")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument(
+            '--section', choices=list(EXPORT_SECTIONS), action='append',
+            help="قسم واحد أو أكثر (الافتراضي: الكل). CSV يحتاج قسمًا واحدًا.",
+        )
+        parser.add_argument('--output', help="ملف الإخراج (الافتراضي: stdout).")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lookup = {'pk': options['user']} if options['user'].isdigit() else {'username': options['user']}
+        user = UserProfile.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"المستخدم {options['user']} غير موجود.")
+
+        sections = options['section']
+        if options['format'] == 'csv':
+            if not sections or len(sections) != 1:
+                raise CommandError("CSV يحتاج --section واحد لأن أعمدة الأقسام مختلفة.")
+            lines = iter_csv(user, sections[0], options['chunk_size'])
+        else:
+            lines = iter_ndjson(user, sections, options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
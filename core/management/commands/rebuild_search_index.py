@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.utils.search_utils import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "إعادة إنشاء جداول وtriggers البحث (FTS5) وتعبئتها من الموارد والرسائل. "
+        "migrate يعيد الـ triggers تلقائيًا إذا حذفها إعادة بناء جدول؛ هذا للإصلاح اليدوي (مثل كتابات قبل الـ triggers)."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("فهرس FTS5 متاح مع SQLite فقط.")
+        with transaction.atomic(), connection.cursor() as cursor:
+            rebuild_search_index(cursor)
+            cursor.execute("SELECT (SELECT count(*) FROM core_resource_fts), (SELECT count(*) FROM core_chatmessage_fts)")
+            resources, messages = cursor.fetchone()
+        self.stdout.write(f"تمت فهرسة {resources} مورد و {messages} رسالة.")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.models import MetricCounter
+from core.utils.metrics_utils import rebuild_metrics
+
+
+class Command(BaseCommand):
+    help = "إعادة حساب جدول العدادات (MetricCounter) من الجداول الأصلية وإصلاح أي انحراف."
+
+    def handle(self, *args, **options):
+        before = {(name, day): value for name, day, value in MetricCounter.objects.values_list('name', 'day', 'value')}
+        after = rebuild_metrics()
+
+        drift = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+        drift = {key: delta for key, delta in drift.items() if delta}
+        for (name, day), delta in sorted(drift.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            self.stdout.write(f"  {name} {day or 'total'}: {delta:+d}")
+        self.stdout.write(self.style.SUCCESS(f"✅ تمت إعادة حساب {len(after)} عداد ({len(drift)} منها كان منحرفًا)."))
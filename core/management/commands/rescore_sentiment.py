@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+
+from core.models import ChatMessage, MoodLog
+from core.utils.sentiment_utils import analyze_sentiment_batch, configure_arabic_folding
+from core.utils.session_utils import bump_messages_revision
+
+
+def _message_row(pk, mood, score):
+    return ChatMessage(pk=pk, sentiment=mood)
+
+
+def _mood_log_row(pk, mood, score):
+    return MoodLog(pk=pk, mood=mood, sentiment_score=score)
+
+
+# الهدف: (queryset, حقل النص, الحقول المحسوبة, بناء الصف المحدث)
+TARGETS = {
+    # رسائل الـ AI تأخذ مزاج رسالة المستخدم، لذلك نعيد تحليل رسائل المستخدم فقط
+    'messages': (lambda: ChatMessage.objects.filter(is_ai=False), 'content', ['sentiment'], _message_row),
+    'moodlogs': (lambda: MoodLog.objects.exclude(notes=''), 'notes', ['mood', 'sentiment_score'], _mood_log_row),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "إعادة حساب ChatMessage.sentiment و MoodLog.mood/sentiment_score بعد تعديل قوائم الكلمات. "
+        "يقرأ الصفوف على دفعات حسب المفتاح الأساسي، ويحللها على عدة عمليات، ويكتبها بـ bulk_update، "
+        "ويحفظ نقطة استئناف بعد كل دفعة."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=[*TARGETS, 'all'], default='all')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--checkpoint', default=str(Path(settings.BASE_DIR) / '.rescore_sentiment.json'),
+            help="ملف نقطة الاستئناف (آخر pk تمت كتابته لكل جدول).",
+        )
+        parser.add_argument('--restart', action='store_true', help="تجاهل نقطة الاستئناف والبدء من أول جدول.")
+        parser.add_argument('--dry-run', action='store_true', help="التحليل بدون كتابة.")
+
+    def handle(self, *args, **options):
+        self.checkpoint_path = Path(options['checkpoint'])
+        self.checkpoint = {} if options['restart'] else self._load_checkpoint()
+        targets = list(TARGETS) if options['target'] == 'all' else [options['target']]
+
+        # نغلق الاتصال قبل إنشاء العمليات حتى لا ترث العمليات الفرعية اتصال قاعدة البيانات
+        close_old_connections()
+        workers = max(1, options['workers'])
+        # مع spawn لا ترث العمليات إعدادات Django، فنمرر التوحيد صراحة
+        folding = getattr(settings, 'SENTIMENT_ARABIC_FOLDING', False)
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_arabic_folding, initargs=(folding,)) as pool:
+            for target in targets:
+                # نبقي عددًا محدودًا من الدفعات قيد التحليل حتى تبقى الذاكرة ثابتة
+                self._rescore(target, pool, 2 * workers, options)
+
+        if not options['dry_run']:
+            # نحذف فقط نقاط الجداول التي اكتملت، فتشغيل --target واحد لا يضيّع تقدم الآخر
+            for target in targets:
+                self.checkpoint.pop(target, None)
+            if self.checkpoint:
+                self._save_checkpoint()
+            elif self.checkpoint_path.exists():
+                self.checkpoint_path.unlink()
+        self.stdout.write(self.style.SUCCESS("✅ تمت إعادة التحليل."))
+
+    def _rescore(self, target, pool, max_in_flight, options):
+        get_queryset, text_field, fields, build_row = TARGETS[target]
+        queryset = get_queryset()
+        model = queryset.model
+        last_pk = self.checkpoint.get(target, 0)
+        total = queryset.filter(pk__gt=last_pk).count()
+        self.stdout.write(f"{target}: {total} صف (بدءًا بعد pk={last_pk})")
+
+        chunk_size = options['chunk_size']
+        in_flight = deque()
+        done = updated = 0
+        started = time.monotonic()
+
+        while True:
+            while len(in_flight) < max_in_flight:
+                chunk = list(
+                    queryset.filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', text_field, *fields)[:chunk_size]
+                    .iterator(chunk_size=chunk_size)
+                )
+                if not chunk:
+                    break
+                last_pk = chunk[-1][0]
+                in_flight.append((chunk, pool.submit(analyze_sentiment_batch, [row[1] for row in chunk])))
+
+            if not in_flight:
+                break
+
+            chunk, future = in_flight.popleft()
+            moods, scores = future.result()
+            changed = [
+                build_row(row[0], mood, score)
+                for row, mood, score in zip(chunk, moods.tolist(), scores.tolist())
+                if row[2:] != (mood, score)[:len(fields)]
+            ]
+            if not options['dry_run']:
+                with transaction.atomic():
+                    model.objects.bulk_update(changed, fields, batch_size=chunk_size)
+                    if model is ChatMessage and changed:
+                        # bulk_update لا يرسل signals، فنغيّر ETag سجل الرسائل بأنفسنا
+                        bump_messages_revision(
+                            ChatMessage.objects.filter(pk__in=[row.pk for row in changed]).values('session_id')
+                        )
+                self.checkpoint[target] = chunk[-1][0]
+                self._save_checkpoint()
+
+            done += len(chunk)
+            updated += len(changed)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"  {target}: {done}/{total} ({done * 100 // max(total, 1)}%) — "
+                f"{updated} محدث — {done / max(elapsed, 1e-9):.0f} صف/ث"
+            )
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return {}
+        checkpoint = json.loads(self.checkpoint_path.read_text())
+        self.stdout.write(f"استئناف من نقطة الحفظ: {checkpoint}")
+        return checkpoint
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.checkpoint))
+        tmp_path.replace(self.checkpoint_path)
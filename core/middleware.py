@@ -0,0 +1,85 @@
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .utils.perf_utils import (
+    install_query_timer, performance_registry, server_timing_header, start_request_timings, stop_request_timings,
+)
+
+
+class PerformanceMiddleware:
+    """
+    يقيس لكل طلب: الزمن الكلي، عدد الاستعلامات وزمنها (execute_wrapper)، وزمن تحليل المشاعر،
+    ويرسلها في Server-Timing ويجمعها في هيستوجرام لكل مسار (admin/perf/).
+    يعمل فقط مع PERFORMANCE_MONITORING = True، وإلا يُزال من السلسلة بالكامل.
+    جسم StreamingHttpResponse يُولَّد بعد رجوع الـ middleware فلا يدخل في القياس.
+    يدعم sync و async، فتفعيله تحت ASGI لا يعيد الواجهات async إلى خيط.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_MONITORING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        install_query_timer()
+        timings, token = start_request_timings()
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_timings(token)
+        return self.finish(request, response, timings, perf_counter() - start)
+
+    async def __acall__(self, request):
+        await sync_to_async(install_query_timer)()
+        timings, token = start_request_timings()
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_request_timings(token)
+        return self.finish(request, response, timings, perf_counter() - start)
+
+    def finish(self, request, response, timings, wall):
+        match = getattr(request, 'resolver_match', None)
+        route = f"{request.method} {match.view_name if match else '<unmatched>'}"
+        performance_registry.record(route, wall, timings)
+        response['Server-Timing'] = server_timing_header(wall, timings)
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise يدعم sync فقط، فوجوده في السلسلة تحت ASGI يعيد كل واجهة async إلى خيط (async_to_sync).
+    نفس السلوك مع مسار async: الملف الثابت يُرجع مباشرة (بحث في قاموس) وغيره يُمرَّر بـ await.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_activity'], name='session_active_idle_idx'),
+        ),
+    ]
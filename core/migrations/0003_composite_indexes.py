@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:30
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Now
+
+
+def close_duplicate_active_sessions(apps, schema_editor):
+    # قبل إضافة القيد: نبقي أحدث جلسة نشطة لكل مستخدم وننهي الباقي
+    Session = apps.get_model('core', 'Session')
+    duplicates = (
+        Session.objects.filter(is_active=True).order_by()
+        .values('user').annotate(active=Count('id')).filter(active__gt=1)
+    )
+    for row in duplicates:
+        active = Session.objects.filter(user_id=row['user'], is_active=True)
+        keep = active.order_by('-last_activity', '-id').first()
+        active.exclude(pk=keep.pk).update(is_active=False, end_time=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_session_idle_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aisuggestion',
+            index=models.Index(fields=['user', 'generated_at', 'id'], name='suggestion_user_generated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['session', 'timestamp', 'id'], name='chatmsg_session_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moodlog',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='moodlog_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['start_time'], name='session_start_time_idx'),
+        ),
+        migrations.RunPython(close_duplicate_active_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('user',), name='one_active_session_per_user'),
+        ),
+    ]
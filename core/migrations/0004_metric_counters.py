@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:34
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def seed_metrics(apps, schema_editor):
+    # تعبئة العدادات من البيانات الموجودة (نسخة ثابتة من rebuild_metrics بالنماذج التاريخية)
+    UserProfile = apps.get_model('core', 'UserProfile')
+    Session = apps.get_model('core', 'Session')
+    ChatMessage = apps.get_model('core', 'ChatMessage')
+    MetricCounter = apps.get_model('core', 'MetricCounter')
+
+    values = {
+        ('messages', None): ChatMessage.objects.count(),
+        ('mood_logs', None): apps.get_model('core', 'MoodLog').objects.count(),
+        ('suggestions', None): apps.get_model('core', 'AISuggestion').objects.count(),
+        ('resources', None): apps.get_model('core', 'Resource').objects.count(),
+    }
+    users = UserProfile.objects.aggregate(
+        total=Count('id'),
+        clients=Count('id', filter=Q(role='client')),
+        therapists=Count('id', filter=Q(role='therapist')),
+    )
+    values[('users.total', None)] = users['total']
+    values[('users.client', None)] = users['clients']
+    values[('users.therapist', None)] = users['therapists']
+
+    sessions = Session.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        completed=Count('id', filter=Q(is_completed=True)),
+    )
+    values[('sessions.total', None)] = sessions['total']
+    values[('sessions.active', None)] = sessions['active']
+    values[('sessions.completed', None)] = sessions['completed']
+
+    for name, model, field in [('sessions.started', Session, 'start_time'), ('messages', ChatMessage, 'timestamp')]:
+        rows = model.objects.order_by().annotate(day=TruncDate(field)).values('day').annotate(total=Count('id'))
+        for row in rows:
+            values[(name, row['day'])] = row['total']
+
+    MetricCounter.objects.bulk_create(
+        [MetricCounter(name=name, day=day, value=value) for (name, day), value in values.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('name',), name='metric_total_unique'), models.UniqueConstraint(condition=models.Q(('day__isnull', False)), fields=('name', 'day'), name='metric_daily_unique')],
+            },
+        ),
+        migrations.RunPython(seed_metrics, migrations.RunPython.noop),
+    ]
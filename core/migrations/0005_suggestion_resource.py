@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_metric_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aisuggestion',
+            name='resource',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suggestions', to='core.resource'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:02
+
+import re
+
+from django.db import migrations
+
+# نسخة ثابتة من SQL البحث وقت هذا الـ migration (0008 يستبدل الـ triggers بـ SQL عادي)
+
+
+def daem_normalize(text):
+    return re.sub(r'[^\w\s]', '', text.lower()) if text else ''
+
+
+SEARCH_INDEX_SQL = [
+    "CREATE VIRTUAL TABLE core_resource_fts USING fts5(title, description, tags, tokenize='unicode61')",
+    "CREATE VIRTUAL TABLE core_chatmessage_fts USING fts5(content, tokenize='unicode61')",
+
+    """CREATE TRIGGER core_resource_fts_insert AFTER INSERT ON core_resource BEGIN
+        INSERT INTO core_resource_fts(rowid, title, description, tags)
+        VALUES (new.id, daem_normalize(new.title), daem_normalize(new.description), daem_normalize(new.tags));
+    END""",
+    """CREATE TRIGGER core_resource_fts_update AFTER UPDATE OF title, description, tags ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+        INSERT INTO core_resource_fts(rowid, title, description, tags)
+        VALUES (new.id, daem_normalize(new.title), daem_normalize(new.description), daem_normalize(new.tags));
+    END""",
+    """CREATE TRIGGER core_resource_fts_delete AFTER DELETE ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+    END""",
+
+    """CREATE TRIGGER core_chatmessage_fts_insert AFTER INSERT ON core_chatmessage BEGIN
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, daem_normalize(new.content));
+    END""",
+    """CREATE TRIGGER core_chatmessage_fts_update AFTER UPDATE OF content ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, daem_normalize(new.content));
+    END""",
+    """CREATE TRIGGER core_chatmessage_fts_delete AFTER DELETE ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+    END""",
+
+    """INSERT INTO core_resource_fts(rowid, title, description, tags)
+       SELECT id, daem_normalize(title), daem_normalize(description), daem_normalize(tags) FROM core_resource""",
+    """INSERT INTO core_chatmessage_fts(rowid, content)
+       SELECT id, daem_normalize(content) FROM core_chatmessage""",
+]
+
+DROP_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS core_resource_fts_insert",
+    "DROP TRIGGER IF EXISTS core_resource_fts_update",
+    "DROP TRIGGER IF EXISTS core_resource_fts_delete",
+    "DROP TRIGGER IF EXISTS core_chatmessage_fts_insert",
+    "DROP TRIGGER IF EXISTS core_chatmessage_fts_update",
+    "DROP TRIGGER IF EXISTS core_chatmessage_fts_delete",
+    "DROP TABLE IF EXISTS core_resource_fts",
+    "DROP TABLE IF EXISTS core_chatmessage_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 خاص بـ SQLite؛ القواعد الأخرى تستخدم البحث البديل في search_utils
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.connection.ensure_connection()
+    schema_editor.connection.connection.create_function('daem_normalize', 1, daem_normalize, deterministic=True)
+    for statement in SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_suggestion_resource'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# نسخة ثابتة من search_utils وقت هذا الـ migration: triggers بـ SQL عادي بدلًا من daem_normalize،
+# حتى تعمل الكتابة من أي أداة. التشكيل يُحذف بـ replace() لأن unicode61 يعامله كفاصل.
+DIACRITICS = ''.join(chr(code) for code in range(0x064B, 0x0656)) + '\u0670'
+
+
+def strip_diacritics(column):
+    for mark in DIACRITICS:
+        column = f"replace({column}, '{mark}', '')"
+    return column
+
+
+def resource_values(row):
+    return ', '.join(strip_diacritics(f'{row}{field}') for field in ('title', 'description', 'tags'))
+
+
+TRIGGERS_SQL = {
+    'core_resource_fts_insert': f"""CREATE TRIGGER core_resource_fts_insert AFTER INSERT ON core_resource BEGIN
+        INSERT INTO core_resource_fts(rowid, title, description, tags) VALUES (new.id, {resource_values('new.')});
+    END""",
+    'core_resource_fts_update': f"""CREATE TRIGGER core_resource_fts_update AFTER UPDATE OF title, description, tags ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+        INSERT INTO core_resource_fts(rowid, title, description, tags) VALUES (new.id, {resource_values('new.')});
+    END""",
+    'core_resource_fts_delete': """CREATE TRIGGER core_resource_fts_delete AFTER DELETE ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+    END""",
+    'core_chatmessage_fts_insert': f"""CREATE TRIGGER core_chatmessage_fts_insert AFTER INSERT ON core_chatmessage BEGIN
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, {strip_diacritics('new.content')});
+    END""",
+    'core_chatmessage_fts_update': f"""CREATE TRIGGER core_chatmessage_fts_update AFTER UPDATE OF content ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, {strip_diacritics('new.content')});
+    END""",
+    'core_chatmessage_fts_delete': """CREATE TRIGGER core_chatmessage_fts_delete AFTER DELETE ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+    END""",
+}
+
+REBUILD_SQL = [
+    "DELETE FROM core_resource_fts",
+    f"INSERT INTO core_resource_fts(rowid, title, description, tags) SELECT id, {resource_values('')} FROM core_resource",
+    "DELETE FROM core_chatmessage_fts",
+    f"INSERT INTO core_chatmessage_fts(rowid, content) SELECT id, {strip_diacritics('content')} FROM core_chatmessage",
+]
+
+
+def replace_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, statement in TRIGGERS_SQL.items():
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(statement)
+    # النص المفهرس سابقًا بدون رموز؛ الآن الرموز فواصل كما في unicode61
+    for statement in REBUILD_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_list_ordering_indexes'),
+    ]
+
+    operations = [
+        # الرجوع يترك triggers الـ SQL العادي (تعمل مع الكود القديم أيضًا)، و 0006 يحذفها عند الرجوع قبله
+        migrations.RunPython(replace_search_triggers, migrations.RunPython.noop),
+    ]
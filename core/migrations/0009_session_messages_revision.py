@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_plain_sql_search_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='messages_revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -15,6 +15,12 @@ class UserProfile(AbstractUser):
     bio = models.TextField(blank=True)
     is_verified = models.BooleanField(default=False)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # ترتيب UserProfileList بالمؤشر
+            models.Index(fields=['-date_joined', '-id'], name='user_date_joined_idx'),
+        ]
+
 
 
 
@@ -31,9 +37,21 @@ class Session(models.Model):
     summary_generated_by_ai = models.TextField(blank=True)  # AI يلخص الجلسة
     is_completed = models.BooleanField(default=False)
     last_activity = models.DateTimeField(auto_now=True)
+    # يزيد عند تعديل رسائل موجودة (ETag سجل الرسائل)، لأن آخر رسالة وعددها لا يتغيران حينها
+    messages_revision = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['start_time']
+        indexes = [
+            # لمنظف الجلسات الخاملة (expire_sessions)
+            models.Index(fields=['last_activity'], condition=models.Q(is_active=True), name='session_active_idle_idx'),
+            # جلسات اليوم في الإحصائيات
+            models.Index(fields=['start_time'], name='session_start_time_idx'),
+        ]
+        constraints = [
+            # جلسة نشطة واحدة فقط لكل مستخدم (ويُستخدم أيضًا للبحث عن الجلسة النشطة)
+            models.UniqueConstraint(fields=['user'], condition=models.Q(is_active=True), name='one_active_session_per_user'),
+        ]
     def __str__(self):
         return f"جلسة مع {self.user.username} - {'نشطة' if self.is_active else 'منتهية'}"
 
@@ -46,6 +64,12 @@ class MoodLog(models.Model):
     notes = models.TextField(blank=True)  # المستخدم يكتب مشاعره هنا
     sentiment_score = models.FloatField(null=True, blank=True)  # هنا يتم كتابة النتيجة عن طريق مكتبات الذكاء بعد ادخال النص لها وتحليله
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='moodlog_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Mood: {self.mood} for session {self.session.id}"
 #✅ الهدف: ربط ما يقوله المستخدم مع تحليلات الـ AI عبر sentiment_score (مثلاً -1 إلى +1).
@@ -58,6 +82,12 @@ class AISuggestion(models.Model):
     source_type = models.CharField(max_length=50, choices=[('mood', 'Mood'), ('chat', 'Chat'), ('manual', 'Manual')])
     generated_at = models.DateTimeField(auto_now_add=True)
     accepted_by_user = models.BooleanField(default=False)
+    resource = models.ForeignKey('Resource', on_delete=models.SET_NULL, null=True, blank=True, related_name='suggestions')  # المورد المقترح حسب المزاج
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'generated_at', 'id'], name='suggestion_user_generated_idx'),
+        ]
 #✅ الهدف: حفظ كل توصية يقدمها الذكاء الاصطناعي لتقييم فعاليتها لاحقًا أو تعديلها.
 
 class ChatMessage(models.Model):
@@ -67,6 +97,12 @@ class ChatMessage(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     is_ai = models.BooleanField(default=False)
     sentiment = models.CharField(max_length=50, blank=True)  # مثل "غضب، قلق، حياد"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'timestamp', 'id'], name='chatmsg_session_ts_idx'),
+        ]
+
     def __str__(self):
         sender_name = self.sender.username if self.sender else "AI"
         return f"رسالة من {sender_name} في {self.timestamp}"
@@ -96,5 +132,27 @@ class Resource(models.Model):
     tags = models.CharField(max_length=255)  # للربط مع التوصيات
     language = models.CharField(max_length=50, default='ar')
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # الترتيب الافتراضي لـ KeysetPagination في قائمة المصادر
+            models.Index(fields=['-created_at', '-id'], name='resource_created_idx'),
+        ]
 #✅ الهدف: الذكاء الاصطناعي يمكنه اقتراح مصادر تلقائيًا بناءً على tags أو mood.
 
+
+
+class MetricCounter(models.Model):
+    name = models.CharField(max_length=50)  # مثل messages أو sessions.active
+    day = models.DateField(null=True, blank=True)  # فارغ = العداد الإجمالي، وإلا عداد يومي
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name'], condition=models.Q(day__isnull=True), name='metric_total_unique'),
+            models.UniqueConstraint(fields=['name', 'day'], condition=models.Q(day__isnull=False), name='metric_daily_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.day or 'total'}) = {self.value}"
+#✅ الهدف: إحصائيات المنصة تُقرأ من عدادات محدثة أولاً بأول بدل count() على الجداول الكبيرة.
@@ -0,0 +1,168 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    ترقيم بالمؤشر (keyset) على (created_at, id) أو أي ترتيب تحدده الفيو في keyset_ordering.
+    كل صفحة هي WHERE (created_at, id) < (آخر قيمة) ORDER BY ... LIMIT،
+    فتكلفة الصفحة ثابتة مهما تعمق العميل (بدون OFFSET).
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+    # أساس روابط next/previous؛ None يعني رابط الطلب كما هو
+    base_url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size, cursor = self._prepare(queryset, request, view)
+        return self._finish(list(queryset[:page_size + 1]), page_size, cursor)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """نفس paginate_queryset للواجهات async (قراءة الصفحة بالـ ORM غير المتزامن)."""
+        queryset, page_size, cursor = self._prepare(queryset, request, view)
+        return self._finish([row async for row in queryset[:page_size + 1]], page_size, cursor)
+
+    def _prepare(self, queryset, request, view):
+        self.request = request
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor:
+            cursor['values'] = self._to_python(queryset.model, cursor['values'])
+        reverse = bool(cursor and cursor['reverse'])
+        ordering = [self._invert(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            # للأمام في ترتيب تنازلي = أصغر من آخر قيمة، وللخلف = أكبر
+            queryset = queryset.filter(self._seek(cursor['values'], lookup='lt' if self.descending != reverse else 'gt'))
+        return queryset, page_size, cursor
+
+    def _finish(self, rows, page_size, cursor):
+        reverse = bool(cursor and cursor['reverse'])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values = payload['v']
+            if len(values) != len(self.fields):
+                raise ValueError
+            return {'values': values, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, model, values):
+        try:
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, row, reverse):
+        # الصف كائن موديل أو dict من queryset.values()
+        values = [row[field] if isinstance(row, dict) else getattr(row, field) for field in self.fields]
+        payload = {'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]}
+        if reverse:
+            payload['r'] = 1
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        base_url = self.base_url or self.request.build_absolute_uri()
+        return replace_query_param(base_url, self.cursor_query_param, cursor)
+
+    def _seek(self, values, lookup):
+        # (a, b) < (x, y)  ⇔  a < x OR (a = x AND b < y)
+        conditions = []
+        for index, field in enumerate(self.fields):
+            equal = {name: value for name, value in zip(self.fields[:index], values[:index])}
+            conditions.append(Q(**equal, **{f'{field}__{lookup}': values[index]}))
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class SearchPagination(KeysetPagination):
+    """
+    ترقيم نتائج البحث بالمؤشر على (rank, id) للأمام فقط.
+    search(after, limit) ترجع كائنات فيها rank، و after هو (rank, id) لآخر نتيجة أو None.
+    """
+
+    def paginate_search(self, search, request):
+        self.request = request
+        self.fields = ['rank', 'id']
+        page_size = self.get_page_size(request)
+
+        after = None
+        cursor = self.decode_cursor(request)
+        if cursor:
+            try:
+                after = (float(cursor['values'][0]), int(cursor['values'][1]))
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = search(after, page_size + 1)
+        self.has_next, self.has_previous = len(rows) > page_size, False
+        self.page = rows[:page_size]
+        return self.page
@@ -1,4 +1,7 @@
-from rest_framework import serializers
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
 from .models import UserProfile, AISuggestion, MoodLog, Session, ChatMessage, AIModelLog, Resource
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -42,6 +45,9 @@ class SessionSerializer(serializers.ModelSerializer):
         }
 
 class ChatMessageSerializer(serializers.ModelSerializer):
+    # نجلب سجل المزاج مع الجلسة في نفس الاستعلام
+    session = serializers.PrimaryKeyRelatedField(queryset=Session.objects.select_related('mood_log'))
+
     class Meta:
         model = ChatMessage
         fields = ['session', 'sender', 'content', 'is_ai', 'sentiment']
@@ -51,6 +57,12 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         validated_data['sender'] = self.context['request'].user  # تعيين `sender` من `request.user`
         return super().create(validated_data)
 
+class ChatMessageHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatMessage
+        fields = ['id', 'session', 'sender', 'content', 'timestamp', 'is_ai', 'sentiment']
+        read_only_fields = fields
+
 class AIModelLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = AIModelLog
@@ -67,3 +79,95 @@ class ResourceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resource
         fields = '__all__'
+
+
+class FastReadSerializer:
+    """
+    بديل قراءة فقط لـ ModelSerializer في مسارات القوائم (many=True) بنفس المخرجات بالضبط.
+    خطة الحقول تُحسب مرة واحدة لكل صنف من حقول serializer_class: (الاسم، attname في الموديل، الحقل)،
+    والحقل يبقى فقط إذا كان DRF يغيّر القيمة (مثل التواريخ)، والباقي يُنسخ كما هو.
+    الصفوف dicts من queryset.values(*fields()) أو كائنات من queryset.only(*fields()).
+    """
+    serializer_class = None
+    # قيم هذه الحقول من قاعدة البيانات هي نفسها مخرجات to_representation
+    passthrough_fields = (
+        serializers.IntegerField, serializers.FloatField, serializers.CharField, serializers.BooleanField,
+        serializers.ChoiceField, PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def get_plan(cls):
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = cls._plan = tuple(cls._build_plan())
+        return plan
+
+    @classmethod
+    def _build_plan(cls):
+        model = cls.serializer_class.Meta.model
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if '.' in field.source or field.source == '*':
+                raise ImproperlyConfigured(f"{cls.__name__}: الحقل {name} ليس حقلًا مباشرًا في {model.__name__}")
+            yield name, model._meta.get_field(field.source).attname, (
+                None if isinstance(field, cls.passthrough_fields) else field
+            )
+
+    @classmethod
+    def fields(cls):
+        return tuple(source for _, source, _ in cls.get_plan())
+
+    @staticmethod
+    def get_converter(field):
+        if not isinstance(field, serializers.DateTimeField) or hasattr(field, 'timezone'):
+            return field.to_representation
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != ISO_8601:
+            return field.to_representation
+        # DateTimeField.to_representation يقرأ المنطقة الزمنية الحالية لكل قيمة، وهنا مرة واحدة لكل صفحة
+        field_timezone = field.default_timezone()
+
+        def convert(value):
+            if field_timezone is None or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    def to_representation(self, row, plan):
+        if not isinstance(row, dict):
+            row = {source: getattr(row, source) for _, source, _ in plan}
+        data = {}
+        for name, source, convert in plan:
+            value = row[source]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    @property
+    def data(self):
+        plan = [
+            (name, source, field and self.get_converter(field)) for name, source, field in self.get_plan()
+        ]
+        if self.many:
+            return [self.to_representation(row, plan) for row in self.instance]
+        return self.to_representation(self.instance, plan)
+
+
+class FastMoodLogSerializer(FastReadSerializer):
+    serializer_class = MoodLogSerializer
+
+
+class FastAISuggestionSerializer(FastReadSerializer):
+    serializer_class = AISuggestionSerializer
+
+
+class FastResourceSerializer(FastReadSerializer):
+    serializer_class = ResourceSerializer
+
+
+class FastChatMessageHistorySerializer(FastReadSerializer):
+    serializer_class = ChatMessageHistorySerializer
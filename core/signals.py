@@ -0,0 +1,167 @@
+from django.db import connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import invalidate_user_snapshot
+from .models import AISuggestion, ChatMessage, MoodLog, Resource, Session, UserProfile
+from .utils.ai_bot import AI_BOT_USERNAME, invalidate_ai_bot_cache
+from .utils.resource_cache import invalidate_resource_catalogue
+from .utils.resource_index import resource_index
+from .utils.search_utils import ensure_search_index
+from .utils.metrics_utils import (
+    MESSAGES, MOOD_LOGS, RESOURCES, SESSIONS, SESSIONS_ACTIVE, SESSIONS_COMPLETED, SESSIONS_STARTED,
+    SUGGESTIONS, USERS, bump_metrics, users_by_role,
+)
+from .utils.session_utils import bump_messages_revision
+
+
+# ✅ migration يعيد بناء core_resource أو core_chatmessage في SQLite يحذف triggers البحث
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    if sender.name == 'core':
+        ensure_search_index(connections[using])
+
+
+# ✅ لقطة المستخدم في CachedJWTAuthentication (الدور، is_active ...)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def forget_user_snapshot(sender, instance, **kwargs):
+    invalidate_user_snapshot(instance.pk)
+
+
+@receiver(post_delete, sender=UserProfile)
+def forget_deleted_ai_bot(sender, instance, **kwargs):
+    if instance.username == AI_BOT_USERNAME:
+        invalidate_ai_bot_cache()
+
+
+# ✅ كاش كتالوج الموارد وفهرس الوسوم: يشمل الكتابة من الـ API ومن لوحة الإدارة.
+# بعد الـ commit فقط، حتى لا تقرأ عملية أخرى الإصدار الجديد مع بيانات لم تُحفظ بعد.
+def refresh_resource_catalogue(resource_id, tags=None, language=None, deleted=False):
+    previous = resource_index.version
+    version = invalidate_resource_catalogue()
+    if previous is None or version != previous + 1:
+        return  # الفهرس قديم أصلًا، وسيُعاد بناؤه عند أول توصية
+    if deleted:
+        resource_index.remove(resource_id, version)
+    else:
+        resource_index.update(resource_id, tags, language, version)
+
+
+@receiver(post_save, sender=Resource)
+def resource_saved(sender, instance, **kwargs):
+    resource_id, tags, language = instance.pk, instance.tags, instance.language
+    transaction.on_commit(lambda: refresh_resource_catalogue(resource_id, tags, language))
+
+
+@receiver(post_delete, sender=Resource)
+def resource_deleted(sender, instance, **kwargs):
+    resource_id = instance.pk
+    transaction.on_commit(lambda: refresh_resource_catalogue(resource_id, deleted=True))
+
+
+# ✅ العدادات (MetricCounter)
+# الكتابات الجماعية (bulk_create / update) لا ترسل إشارات، لذلك تحدّث العدادات بنفسها
+# في chat_utils.save_chat_exchange و session_utils.expire_idle_sessions.
+
+TRACKED_FIELDS = {
+    UserProfile: ('role',),
+    Session: ('is_active', 'is_completed'),
+}
+
+
+@receiver(post_init, sender=UserProfile)
+@receiver(post_init, sender=Session)
+def remember_metric_state(sender, instance, **kwargs):
+    # __dict__ حتى لا نسبب استعلامًا للحقول المؤجلة (only/defer)
+    instance._metric_state = tuple(instance.__dict__.get(field) for field in TRACKED_FIELDS[sender])
+
+
+@receiver(post_save, sender=UserProfile)
+def count_saved_user(sender, instance, created, **kwargs):
+    (old_role,) = instance._metric_state
+    if created:
+        bump_metrics({(USERS, None): 1, (users_by_role(instance.role), None): 1})
+    elif old_role is not None and old_role != instance.role:
+        bump_metrics({(users_by_role(old_role), None): -1, (users_by_role(instance.role), None): 1})
+    remember_metric_state(sender, instance)
+
+
+@receiver(post_delete, sender=UserProfile)
+def count_deleted_user(sender, instance, **kwargs):
+    bump_metrics({(USERS, None): -1, (users_by_role(instance.role), None): -1})
+
+
+@receiver(post_save, sender=Session)
+def count_saved_session(sender, instance, created, **kwargs):
+    was_active, was_completed = (False, False) if created else instance._metric_state
+    deltas = {}
+    if created:
+        deltas[(SESSIONS, None)] = 1
+        deltas[(SESSIONS_STARTED, timezone.localdate(instance.start_time))] = 1
+    if was_active is not None:
+        deltas[(SESSIONS_ACTIVE, None)] = int(instance.is_active) - int(was_active)
+    if was_completed is not None:
+        deltas[(SESSIONS_COMPLETED, None)] = int(instance.is_completed) - int(was_completed)
+    bump_metrics(deltas)
+    remember_metric_state(sender, instance)
+
+
+@receiver(post_delete, sender=Session)
+def count_deleted_session(sender, instance, **kwargs):
+    bump_metrics({
+        (SESSIONS, None): -1,
+        (SESSIONS_STARTED, timezone.localdate(instance.start_time)): -1,
+        (SESSIONS_ACTIVE, None): -int(instance.is_active),
+        (SESSIONS_COMPLETED, None): -int(instance.is_completed),
+    })
+
+
+@receiver(post_save, sender=ChatMessage)
+def count_saved_message(sender, instance, created, **kwargs):
+    if created:
+        bump_metrics({(MESSAGES, None): 1, (MESSAGES, timezone.localdate(instance.timestamp)): 1})
+    else:
+        bump_messages_revision([instance.session_id])
+
+
+# ✅ الرسائل تُحذف بالـ cascade بدون إشارات (fast delete)، فنطرحها قبل الحذف باستعلام تجميعي واحد
+# لكل جلسة أو مستخدم. لا يوجد مستقبل على ChatMessage نفسه حتى لا يُلغى الـ fast delete؛
+# حذف رسائل مفردة (مثلًا من الـ admin) يصلحه reconcile_metrics.
+def subtract_messages(messages):
+    per_day = messages.order_by().annotate(day=TruncDate('timestamp')).values('day').annotate(total=Count('id'))
+    deltas = {(MESSAGES, row['day']): -row['total'] for row in per_day}
+    deltas[(MESSAGES, None)] = sum(deltas.values())
+    bump_metrics(deltas)
+
+
+@receiver(pre_delete, sender=Session)
+def count_deleted_session_messages(sender, instance, **kwargs):
+    subtract_messages(ChatMessage.objects.filter(session=instance))
+
+
+@receiver(pre_delete, sender=UserProfile)
+def count_deleted_sender_messages(sender, instance, **kwargs):
+    # رسائله في جلسات غيره (cascade من sender)؛ رسائل جلساته تطرحها count_deleted_session_messages
+    subtract_messages(ChatMessage.objects.filter(sender=instance).exclude(session__user=instance))
+
+
+SIMPLE_COUNTERS = {MoodLog: MOOD_LOGS, AISuggestion: SUGGESTIONS, Resource: RESOURCES}
+
+
+@receiver(post_save, sender=MoodLog)
+@receiver(post_save, sender=AISuggestion)
+@receiver(post_save, sender=Resource)
+def count_saved_row(sender, instance, created, **kwargs):
+    if created:
+        bump_metrics({(SIMPLE_COUNTERS[sender], None): 1})
+
+
+@receiver(post_delete, sender=MoodLog)
+@receiver(post_delete, sender=AISuggestion)
+@receiver(post_delete, sender=Resource)
+def count_deleted_row(sender, instance, **kwargs):
+    bump_metrics({(SIMPLE_COUNTERS[sender], None): -1})
@@ -7,10 +7,23 @@ from .views import (
     AISuggestionListView,
     ResourceListCreateView,
     ResourceDetailView,
+    ResourceSearchView,
+    TherapistMessageSearchView,
     SessionDetailView,
+    SessionMessagesView,
+    UserDataExportView,
     PlatformStatsView,
+    PerformanceStatsView,
     CurrentUserView
 )
+from .async_views import (
+    stream_message,
+    current_user,
+    active_session,
+    mood_log_list,
+    suggestion_list,
+    resource_list
+)
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -42,15 +55,19 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'), # تحديث Access Token باستخدام Refresh Token
     
     path('me/', CurrentUserView.as_view(), name='current-user'),
+    path('me/export/', UserDataExportView.as_view(), name='user-export'),
 
 
     # ✅ جلسات
     path('sessions/', SessionView.as_view(), name='session'),
     path('sessions/<int:pk>/', SessionDetailView.as_view(), name='session-detail'),
+    path('sessions/<int:pk>/messages/', SessionMessagesView.as_view(), name='session-messages'),
+    path('sessions/messages/search/', TherapistMessageSearchView.as_view(), name='session-messages-search'),
 
 
     # ✅ رسائل الشات
     path('send-message/', ChatMessageView.as_view(), name='chat-messages'),
+    path('send-message/stream/', stream_message, name='chat-messages-stream'),  # SSE عبر ASGI
 
     # ✅ سجلات المزاج
     path('mood-logs/', MoodLogListCreateView.as_view(), name='mood-logs'),
@@ -60,8 +77,17 @@ urlpatterns = [
 
     # ✅ الموارد
     path('resources/', ResourceListCreateView.as_view(), name='resource-list-create'),
+    path('resources/search/', ResourceSearchView.as_view(), name='resource-search'),
     path('resources/<int:pk>/', ResourceDetailView.as_view(), name='resource-detail'),
     path('admin/status/', PlatformStatsView.as_view(), name='platform-stats'),
+    path('admin/perf/', PerformanceStatsView.as_view(), name='performance-stats'),
+
+    # ✅ نسخ async من واجهات القراءة (ASGI): نفس الصلاحيات والمخرجات
+    path('async/me/', current_user, name='current-user-async'),
+    path('async/sessions/', active_session, name='session-async'),
+    path('async/mood-logs/', mood_log_list, name='mood-logs-async'),
+    path('async/suggestions/', suggestion_list, name='suggestions-async'),
+    path('async/resources/', resource_list, name='resource-list-async'),
 
 ]
 urlpatterns += [
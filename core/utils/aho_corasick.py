@@ -0,0 +1,59 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    أوتوماتا Aho-Corasick لمطابقة عدة أنماط نصية بمرور واحد على النص.
+    تُبنى مرة واحدة، وكل نمط يأخذ رقمًا حسب ترتيبه في القائمة.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        # بناء روابط الفشل بالعرض (BFS) ودمج مخرجات اللواحق
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+        self._out = [tuple(ids) for ids in self._out]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def find(self, text):
+        """يرجع مجموعة أرقام الأنماط التي ظهرت في النص مرة واحدة على الأقل."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(out[0])
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                found.update(out[state])
+        return found
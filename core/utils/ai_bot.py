@@ -0,0 +1,41 @@
+import threading
+
+from django.db import IntegrityError
+
+AI_BOT_USERNAME = 'AI_Bot'
+
+_bot_id = None
+_lock = threading.Lock()
+
+
+def get_ai_bot_id():
+    """
+    يرجع pk مستخدم الذكاء الاصطناعي (AI_Bot)، وينشئه إذا لم يكن موجودًا.
+    يُحسب مرة واحدة لكل عملية ثم يُقرأ من الذاكرة بدون استعلام.
+    """
+    global _bot_id
+    if _bot_id is None:
+        with _lock:
+            if _bot_id is None:
+                _bot_id = _resolve_ai_bot().pk
+    return _bot_id
+
+
+def invalidate_ai_bot_cache(**kwargs):
+    global _bot_id
+    _bot_id = None
+
+
+def _resolve_ai_bot():
+    from core.models import UserProfile
+
+    try:
+        ai_user, created = UserProfile.objects.get_or_create(username=AI_BOT_USERNAME, defaults={
+            'email': 'ai@daem.com',
+            'role': 'therapist',
+            'is_verified': True
+        })
+    except IntegrityError:
+        # عملية أخرى أنشأته بنفس اللحظة
+        ai_user = UserProfile.objects.get(username=AI_BOT_USERNAME)
+    return ai_user
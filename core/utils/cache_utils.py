@@ -0,0 +1,36 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+
+
+def cached_with_stale_while_revalidate(key, compute, ttl, stale_ttl):
+    """
+    يرجع قيمة compute() من الكاش:
+    - أحدث من ttl: تُرجع مباشرة.
+    - أقدم من ttl وأحدث من ttl + stale_ttl: تُرجع القديمة ويُعاد الحساب في الخلفية
+      (مرة واحدة فقط بفضل قفل cache.add بين العمليات).
+    - غير موجودة: تُحسب الآن.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None:
+        value, computed_at = entry
+        if now - computed_at > ttl and cache.add(f"{key}:refreshing", True, timeout=max(ttl, 1)):
+            threading.Thread(target=_refresh, args=(key, compute, ttl, stale_ttl), daemon=True).start()
+        return value
+    return _store(key, compute(), ttl, stale_ttl)
+
+
+def _store(key, value, ttl, stale_ttl):
+    cache.set(key, (value, time.time()), timeout=ttl + stale_ttl)
+    return value
+
+
+def _refresh(key, compute, ttl, stale_ttl):
+    try:
+        _store(key, compute(), ttl, stale_ttl)
+    finally:
+        cache.delete(f"{key}:refreshing")
+        connections.close_all()  # اتصالات هذا الخيط فقط
@@ -0,0 +1,72 @@
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.utils import timezone
+
+from core.models import AISuggestion, ChatMessage, MoodLog
+from .ai_bot import get_ai_bot_id, invalidate_ai_bot_cache
+from .metrics_utils import MESSAGES, MOOD_LOGS, SUGGESTIONS, bump_metrics
+from .resource_index import invalidate_resource_index, recommend_resources
+from .session_utils import touch_active_session
+from .write_queue import serialized_write
+
+
+@serialized_write
+def save_chat_exchange(user, session, content, detected_mood, sentiment_score, ai_response):
+    """
+    يحفظ رسالة المستخدم ورد الـ AI وسجل المزاج والتوصية في معاملة واحدة.
+    الجلسة يجب أن تكون محمّلة مع mood_log (select_related).
+    يرجع (user_message, ai_message, mood_log, suggestion).
+    """
+    has_mood_log = hasattr(session, 'mood_log')
+    if has_mood_log:
+        notes = f"تحديث المزاج أثناء الجلسة بناءً على الرسالة: {content[:30]}..."
+    else:
+        notes = f"إنشاء المزاج الأول للجلسة بناءً على الرسالة: {content[:30]}..."
+
+    for attempt in range(2):
+        # من الفهرس في الذاكرة (بدون استعلام إلا عند إعادة بنائه)
+        resource_id = next(iter(recommend_resources(detected_mood, limit=1)), None)
+        try:
+            with transaction.atomic():
+                if not touch_active_session(session.id):
+                    raise Http404("No Session matches the given query.")
+
+                user_message, ai_message = ChatMessage.objects.bulk_create([
+                    ChatMessage(session=session, sender=user, content=content, is_ai=False, sentiment=detected_mood),
+                    ChatMessage(session=session, sender_id=get_ai_bot_id(), content=ai_response, is_ai=True, sentiment=detected_mood),
+                ])
+
+                # upsert: ينشئ السجل أو يحدث المزاج والملاحظة فقط (sentiment_score يبقى من أول رسالة)
+                mood_log = MoodLog(
+                    user=user,
+                    session=session,
+                    mood=detected_mood,
+                    notes=notes,
+                    sentiment_score=sentiment_score
+                )
+                MoodLog.objects.bulk_create(
+                    [mood_log], update_conflicts=True, unique_fields=['session'], update_fields=['mood', 'notes']
+                )
+
+                [suggestion] = AISuggestion.objects.bulk_create([AISuggestion(
+                    user=user,
+                    mood_log=mood_log,
+                    suggestion_text=ai_response,
+                    source_type="chat",
+                    resource_id=resource_id,
+                )])
+
+                # bulk_create لا يرسل إشارات، فنحدّث العدادات هنا بـ UPDATE واحد
+                bump_metrics({
+                    (MESSAGES, None): 2,
+                    (MESSAGES, timezone.localdate(user_message.timestamp)): 2,
+                    (SUGGESTIONS, None): 1,
+                    (MOOD_LOGS, None): 0 if has_mood_log else 1,
+                })
+            return user_message, ai_message, mood_log, suggestion
+        except IntegrityError:
+            # غالبًا AI_Bot أو المورد المقترح حُذف من عملية أخرى والـ pk المخزن قديم
+            if attempt:
+                raise
+            invalidate_ai_bot_cache()
+            invalidate_resource_index()
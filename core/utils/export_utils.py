@@ -0,0 +1,78 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import AISuggestion, ChatMessage, MoodLog, Session, UserProfile
+
+EXPORT_CHUNK_SIZE = 2000
+ASYNC_BATCH_SIZE = 500  # أسطر لكل انتقال إلى خيط القاعدة في aiter_lines
+
+# كل قسم: (الاستعلام حسب المستخدم، الحقول المصدّرة). الترتيب يطابق فهارس الجداول.
+EXPORT_SECTIONS = {
+    'user': (
+        lambda user: UserProfile.objects.filter(pk=user.pk),
+        ['id', 'username', 'email', 'role', 'bio', 'date_joined'],
+    ),
+    'sessions': (
+        lambda user: Session.objects.filter(user=user).order_by('start_time', 'id'),
+        ['id', 'therapist_id', 'is_ai_controlled', 'topic', 'is_active', 'start_time', 'end_time',
+         'summary_generated_by_ai', 'is_completed', 'last_activity'],
+    ),
+    'messages': (
+        lambda user: ChatMessage.objects.filter(session__user=user).order_by('session_id', 'timestamp', 'id'),
+        ['id', 'session_id', 'sender_id', 'content', 'timestamp', 'is_ai', 'sentiment'],
+    ),
+    'mood_logs': (
+        lambda user: MoodLog.objects.filter(user=user).order_by('created_at', 'id'),
+        ['id', 'session_id', 'mood', 'notes', 'sentiment_score', 'created_at'],
+    ),
+    'suggestions': (
+        lambda user: AISuggestion.objects.filter(user=user).order_by('generated_at', 'id'),
+        ['id', 'mood_log_id', 'suggestion_text', 'source_type', 'generated_at', 'accepted_by_user'],
+    ),
+}
+
+
+def iter_export_rows(user, sections=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    يرجع (section, row) صفًا صفًا. القراءة بـ values().iterator() على دفعات،
+    فلا يتم بناء نماذج ولا تحميل كل البيانات في الذاكرة.
+    """
+    for section in sections or EXPORT_SECTIONS:
+        build_queryset, fields = EXPORT_SECTIONS[section]
+        for row in build_queryset(user).values(*fields).iterator(chunk_size=chunk_size):
+            yield section, row
+
+
+def iter_ndjson(user, sections=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """سطر JSON لكل صف مع حقل type باسم القسم."""
+    for section, row in iter_export_rows(user, sections, chunk_size):
+        yield json.dumps({'type': section, **row}, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    # csv.writer يحتاج ملفًا، وهذا "الملف" يرجع السطر بدل كتابته
+    def write(self, value):
+        return value
+
+
+def iter_csv(user, section, chunk_size=EXPORT_CHUNK_SIZE):
+    """CSV لقسم واحد (الأعمدة تختلف بين الأقسام): سطر العناوين ثم الصفوف."""
+    fields = EXPORT_SECTIONS[section][1]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for _, row in iter_export_rows(user, [section], chunk_size):
+        yield writer.writerow([row[field] for field in fields])
+
+
+async def aiter_lines(lines, batch_size=ASYNC_BATCH_SIZE):
+    """
+    نفس الأسطر كمولد async للبث تحت ASGI: مع مولد متزامن يجمعه Django كله في الذاكرة
+    (sync_to_async(list)). كل دفعة تُقرأ في خيط الطلب (thread_sensitive) مع اتصاله ومؤشره.
+    """
+    next_batch = sync_to_async(lambda: list(islice(lines, batch_size)))
+    while batch := await next_batch():
+        yield ''.join(batch)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# أسماء العدادات
+USERS = 'users.total'
+SESSIONS = 'sessions.total'
+SESSIONS_ACTIVE = 'sessions.active'
+SESSIONS_COMPLETED = 'sessions.completed'
+SESSIONS_STARTED = 'sessions.started'  # يومي
+MESSAGES = 'messages'                  # إجمالي + يومي
+MOOD_LOGS = 'mood_logs'
+SUGGESTIONS = 'suggestions'
+RESOURCES = 'resources'
+
+
+def users_by_role(role):
+    return f'users.{role}'
+
+
+def bump_metrics(deltas):
+    """
+    يزيد العدادات: deltas = {(name, day): delta} و day=None للعداد الإجمالي.
+    استعلامان ثابتان مهما كان عدد العدادات: إنشاء الصفوف الناقصة ثم UPDATE واحد.
+    """
+    from core.models import MetricCounter
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    conditions = {key: Q(name=key[0], day=key[1]) if key[1] else Q(name=key[0], day__isnull=True) for key in deltas}
+    MetricCounter.objects.bulk_create(
+        [MetricCounter(name=name, day=day) for name, day in deltas], ignore_conflicts=True
+    )
+    MetricCounter.objects.filter(reduce(or_, conditions.values())).update(
+        value=F('value') + Case(*[When(conditions[key], then=Value(delta)) for key, delta in deltas.items()], default=Value(0))
+    )
+
+
+def read_platform_metrics():
+    """قراءة O(1): كل العدادات الإجمالية + جلسات اليوم باستعلام واحد."""
+    from core.models import MetricCounter
+
+    today = timezone.localdate()
+    values = {
+        (name, day): value
+        for name, day, value in MetricCounter.objects.filter(
+            Q(day__isnull=True) | Q(name=SESSIONS_STARTED, day=today)
+        ).values_list('name', 'day', 'value')
+    }
+
+    def total(name):
+        return values.get((name, None), 0)
+
+    return {
+        "users": {
+            "total": total(USERS),
+            "clients": total(users_by_role('client')),
+            "therapists": total(users_by_role('therapist')),
+        },
+        "sessions": {
+            "total": total(SESSIONS),
+            "active": total(SESSIONS_ACTIVE),
+            "completed": total(SESSIONS_COMPLETED),
+            "today": values.get((SESSIONS_STARTED, today), 0),
+        },
+        "messages": total(MESSAGES),
+        "mood_logs": total(MOOD_LOGS),
+        "suggestions": total(SUGGESTIONS),
+        "resources": total(RESOURCES),
+    }
+
+
+def read_metric_history(days):
+    """سلسلة يومية لآخر days يومًا (جلسات جديدة ورسائل) بدون المرور على Session أو ChatMessage."""
+    from core.models import MetricCounter
+
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    values = {
+        (name, day): value
+        for name, day, value in MetricCounter.objects.filter(
+            name__in=[SESSIONS_STARTED, MESSAGES], day__gte=first_day, day__lte=today
+        ).values_list('name', 'day', 'value')
+    }
+    return [
+        {
+            "date": day,
+            "sessions": values.get((SESSIONS_STARTED, day), 0),
+            "messages": values.get((MESSAGES, day), 0),
+        }
+        for day in (first_day + timedelta(days=offset) for offset in range(days))
+    ]
+
+
+def rebuild_metrics(get_model=apps.get_model):
+    """
+    يعيد حساب كل العدادات من الجداول (لإصلاح أي انحراف).
+    get_model قابل للتمرير حتى تستخدمه الـ migrations مع النماذج التاريخية.
+    """
+    UserProfile = get_model('core', 'UserProfile')
+    Session = get_model('core', 'Session')
+    ChatMessage = get_model('core', 'ChatMessage')
+    MetricCounter = get_model('core', 'MetricCounter')
+
+    values = {
+        (MESSAGES, None): ChatMessage.objects.count(),
+        (MOOD_LOGS, None): get_model('core', 'MoodLog').objects.count(),
+        (SUGGESTIONS, None): get_model('core', 'AISuggestion').objects.count(),
+        (RESOURCES, None): get_model('core', 'Resource').objects.count(),
+    }
+    users = UserProfile.objects.aggregate(
+        total=Count('id'),
+        clients=Count('id', filter=Q(role='client')),
+        therapists=Count('id', filter=Q(role='therapist')),
+    )
+    values[(USERS, None)] = users['total']
+    values[(users_by_role('client'), None)] = users['clients']
+    values[(users_by_role('therapist'), None)] = users['therapists']
+
+    sessions = Session.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        completed=Count('id', filter=Q(is_completed=True)),
+    )
+    values[(SESSIONS, None)] = sessions['total']
+    values[(SESSIONS_ACTIVE, None)] = sessions['active']
+    values[(SESSIONS_COMPLETED, None)] = sessions['completed']
+
+    # الأيام حسب التوقيت المحلي مثل bump_metrics
+    for name, model, field in [(SESSIONS_STARTED, Session, 'start_time'), (MESSAGES, ChatMessage, 'timestamp')]:
+        rows = model.objects.order_by().annotate(day=TruncDate(field)).values('day').annotate(total=Count('id'))
+        for row in rows:
+            values[(name, row['day'])] = row['total']
+
+    with transaction.atomic():
+        MetricCounter.objects.all().delete()
+        MetricCounter.objects.bulk_create(
+            [MetricCounter(name=name, day=day, value=value) for (name, day), value in values.items()],
+            batch_size=500,
+        )
+    return values
@@ -0,0 +1,158 @@
+import bisect
+import contextvars
+import math
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.db import connections
+
+# ✅ قياسات الطلب الحالي (وقت القاعدة، عدد الاستعلامات، تحليل المشاعر ...)
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('durations', 'queries')
+
+    def __init__(self):
+        self.durations = defaultdict(float)  # بالثواني
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.durations[name] += seconds
+
+
+def start_request_timings():
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def stop_request_timings(token):
+    _current_timings.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """يضيف زمن الكتلة إلى قياسات الطلب الحالي، ولا يفعل شيئًا خارج الـ middleware."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, perf_counter() - start)
+
+
+def time_query(execute, sql, params, many, context):
+    """execute_wrapper دائم: يعد الاستعلام ويجمع زمنه في قياسات الطلب الحالي إن وُجدت."""
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', perf_counter() - start)
+        timings.queries += 1
+
+
+def install_query_timer():
+    """
+    يثبت time_query مرة واحدة على اتصالات الخيط الحالي.
+    تحت ASGI يُستدعى بـ sync_to_async: الـ ORM (حتى aget و acount) يعمل على خيط آخر باتصالاته،
+    والـ contextvar ينتقل معه فيصل الاستعلام إلى قياسات طلبه.
+    """
+    for connection in connections.all():
+        if time_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(time_query)
+
+
+class Histogram:
+    """
+    هيستوجرام بحدود لوغاريتمية ثابتة (كل حد أكبر بـ 10%): تسجيل O(log n) وذاكرة ثابتة،
+    والنسب المئوية تقريبية بخطأ نسبي أقل من 10%.
+    """
+    BOUNDS = tuple(0.01 * 1.1 ** i for i in range(190))  # من 0.01 حتى ~700000
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = self.BOUNDS[index] if index < len(self.BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(self.max, 3),
+        }
+
+
+class PerformanceRegistry:
+    """الهيستوجرامات لكل مسار داخل العملية (كل worker له أرقامه)."""
+    METRICS = ('wall_ms', 'db_ms', 'queries', 'sentiment_ms')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, wall, timings):
+        values = {
+            'wall_ms': wall * 1000,
+            'db_ms': timings.durations.get('db', 0.0) * 1000,
+            'queries': timings.queries,
+            'sentiment_ms': timings.durations.get('sentiment', 0.0) * 1000,
+        }
+        with self._lock:
+            histograms = self._routes.get(route)
+            if histograms is None:
+                histograms = self._routes[route] = {metric: Histogram() for metric in self.METRICS}
+            for metric, value in values.items():
+                histograms[metric].record(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {'count': histograms['wall_ms'].count,
+                        **{metric: histogram.summary() for metric, histogram in histograms.items()}}
+                for route, histograms in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+performance_registry = PerformanceRegistry()
+
+
+def server_timing_header(wall, timings):
+    parts = [f'app;dur={wall * 1000:.1f}']
+    parts.append(f'db;dur={timings.durations.get("db", 0.0) * 1000:.1f};desc="{timings.queries} queries"')
+    for name, seconds in timings.durations.items():
+        if name != 'db':
+            parts.append(f'{name};dur={seconds * 1000:.1f}')
+    return ', '.join(parts)
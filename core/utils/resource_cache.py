@@ -0,0 +1,100 @@
+import hashlib
+import json
+import time
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.pagination import KeysetPagination
+
+RESOURCE_CACHE_ALIAS = 'resources'
+CATALOGUE_VERSION_KEY = 'resource-catalogue:version'
+CATALOGUE_FILTERS = ('language', 'category')
+
+
+def get_resource_cache():
+    alias = RESOURCE_CACHE_ALIAS if RESOURCE_CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def get_catalogue_version(cache=None):
+    cache = cache or get_resource_cache()
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # رقم زمني وليس 1، حتى لا تعود مفاتيح قديمة للحياة بعد حذف الرقم من الكاش
+        cache.add(CATALOGUE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    return version
+
+
+def invalidate_resource_catalogue():
+    """
+    أي تعديل على الموارد يزيد رقم الإصدار فتصبح كل الصفحات المخزنة قديمة دفعة واحدة.
+    يرجع الإصدار الجديد (incr ذري، فإذا كان السابق + 1 فلم يغيّره أحد غيرنا).
+    """
+    cache = get_resource_cache()
+    try:
+        return cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(CATALOGUE_VERSION_KEY, version, timeout=None)
+        return version
+
+
+def catalogue_url(request):
+    """
+    رابط صفحة الكتالوج بالمعاملات التي تغيّر الصفحة فقط (بعد التطبيع وبترتيب ثابت).
+    هو مفتاح الكاش وأساس روابط next/previous، فالمعاملات الأخرى لا تنشئ مدخلات جديدة.
+    request طلب DRF (query_params).
+    """
+    paginator = KeysetPagination()
+    params = [(field, request.query_params[field]) for field in CATALOGUE_FILTERS if request.query_params.get(field)]
+    if request.query_params.get(paginator.cursor_query_param):
+        params.append((paginator.cursor_query_param, request.query_params[paginator.cursor_query_param]))
+    if request.query_params.get(paginator.page_size_query_param):
+        params.append((paginator.page_size_query_param, paginator.get_page_size(request)))
+    url = request.build_absolute_uri(request.path)
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def _catalogue_key(version, key):
+    return f"resource-catalogue:{version}:{hashlib.md5(key.encode()).hexdigest()}"
+
+
+def _catalogue_entry(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False).encode()
+    return (data, f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def get_cached_catalogue(key, compute):
+    """
+    Read-through: يرجع (data, etag) للصفحة من الكاش، أو يستدعي compute() ويخزن النتيجة.
+    عند الإصابة لا يوجد أي استعلام ولا serializer. الـ ETag قوي (sha1 للمحتوى).
+    """
+    cache = get_resource_cache()
+    # الإصدار يُقرأ قبل الحساب: لو تغيّر أثناءه تُخزن النتيجة تحت الإصدار القديم ولن تُقرأ
+    cache_key = _catalogue_key(get_catalogue_version(cache), key)
+
+    entry = cache.get(cache_key)
+    if entry is None:
+        entry = _catalogue_entry(compute())
+        cache.set(cache_key, entry, timeout=getattr(settings, 'RESOURCE_CACHE_TTL', 300))
+    return entry
+
+
+async def aget_cached_catalogue(key, compute):
+    """نفس get_cached_catalogue للواجهات async: compute دالة async، والكاش عبر aget/aset."""
+    cache = get_resource_cache()
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(get_catalogue_version)(cache)
+    cache_key = _catalogue_key(version, key)
+
+    entry = await cache.aget(cache_key)
+    if entry is None:
+        entry = _catalogue_entry(await compute())
+        await cache.aset(cache_key, entry, timeout=getattr(settings, 'RESOURCE_CACHE_TTL', 300))
+    return entry
@@ -0,0 +1,142 @@
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from .resource_cache import get_catalogue_version
+from .sentiment_utils import normalize_text
+
+# ✅ الوسوم التي تناسب كل مزاج (تُطابق مع Resource.tags بعد التطبيع)
+MOOD_TAGS = {
+    "sadness": ["sadness", "sad", "depression", "حزن", "اكتئاب"],
+    "happiness": ["happiness", "happy", "gratitude", "سعادة", "فرح", "امتنان"],
+    "anxiety": ["anxiety", "stress", "breathing", "قلق", "توتر", "تنفس"],
+    "anger": ["anger", "calm", "غضب", "هدوء"],
+    "neutral": ["general", "wellbeing", "عام"],
+}
+
+DEFAULT_RESOURCE_LANGUAGE = 'ar'  # نفس الافتراضي في Resource.language
+
+_TAG_SEPARATORS = re.compile(r'[,،;|\n]')
+
+
+def normalize_tag(tag):
+    return ' '.join(normalize_text(tag).split())
+
+
+def split_tags(tags):
+    """Resource.tags نص مفصول بفواصل (عربية أو إنجليزية)."""
+    return frozenset(filter(None, (normalize_tag(tag) for tag in _TAG_SEPARATORS.split(tags or ''))))
+
+
+class ResourceTagIndex:
+    """
+    فهرس مقلوب في الذاكرة: وسم → معرفات الموارد، بدل tags__icontains على كل رسالة.
+    الترتيب لكل (مزاج، لغة) يُحسب مرة ويُخزن حتى يتغير أي مورد.
+    version هو إصدار كتالوج الموارد الذي يطابقه الفهرس (انظر resource_cache)،
+    و built_at وقت آخر إعادة بناء كاملة (time.monotonic).
+    """
+
+    def __init__(self, mood_tags=MOOD_TAGS):
+        self.mood_tags = {mood: frozenset(map(normalize_tag, tags)) for mood, tags in mood_tags.items()}
+        self.version = None
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._postings = defaultdict(set)
+        self._resources = {}  # id → (tags, language)
+        self._ranked = {}
+
+    def __len__(self):
+        return len(self._resources)
+
+    def rebuild(self, rows, version):
+        """rows: (id, tags, language) لكل الموارد."""
+        with self._lock:
+            self._postings.clear()
+            self._resources.clear()
+            for resource_id, tags, language in rows:
+                self._add(resource_id, tags, language)
+            self._ranked = {}
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def is_stale(self, version, ttl):
+        if self.version != version or self.built_at is None:
+            return True
+        return ttl is not None and time.monotonic() - self.built_at >= ttl
+
+    def update(self, resource_id, tags, language, version):
+        with self._lock:
+            self._remove(resource_id)
+            self._add(resource_id, tags, language)
+            self._ranked = {}
+            self.version = version
+
+    def remove(self, resource_id, version):
+        with self._lock:
+            self._remove(resource_id)
+            self._ranked = {}
+            self.version = version
+
+    def lookup(self, tag):
+        return frozenset(self._postings.get(normalize_tag(tag), ()))
+
+    def recommend(self, mood, language=DEFAULT_RESOURCE_LANGUAGE, limit=3):
+        """
+        أفضل الموارد للمزاج: الأكثر وسومًا مطابقة، ثم لغة المستخدم، ثم الأحدث.
+        """
+        key = (mood, language)
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            with self._lock:
+                wanted = self.mood_tags.get(mood, frozenset())
+                candidates = set().union(*(self._postings.get(tag, ()) for tag in wanted))
+                ranked = sorted(
+                    candidates,
+                    key=lambda resource_id: (
+                        -len(self._resources[resource_id][0] & wanted),
+                        self._resources[resource_id][1] != language,
+                        -resource_id,
+                    ),
+                )
+                self._ranked[key] = ranked
+        return ranked[:limit]
+
+    def _add(self, resource_id, tags, language):
+        tags = split_tags(tags)
+        self._resources[resource_id] = (tags, language)
+        for tag in tags:
+            self._postings[tag].add(resource_id)
+
+    def _remove(self, resource_id):
+        old = self._resources.pop(resource_id, None)
+        if old is None:
+            return
+        for tag in old[0]:
+            self._postings[tag].discard(resource_id)
+            if not self._postings[tag]:
+                del self._postings[tag]
+
+
+resource_index = ResourceTagIndex()
+
+
+def invalidate_resource_index():
+    resource_index.version = None
+
+
+def recommend_resources(mood, language=DEFAULT_RESOURCE_LANGUAGE, limit=3):
+    """
+    يرجع معرفات الموارد المقترحة للمزاج. التعديلات في هذه العملية تُطبّق تدريجيًا من signals،
+    ويُعاد بناء الفهرس (استعلام واحد) إذا تغيّر إصدار الكتالوج أو مضى RESOURCE_INDEX_TTL على آخر بناء.
+    إصدار الكتالوج لا يرى تعديلات العمليات الأخرى إلا إذا كان كاش 'resources' مشتركًا،
+    لذلك مع LocMem وعدة عمليات قد يتأخر الفهرس حتى RESOURCE_INDEX_TTL ثانية.
+    """
+    from core.models import Resource
+
+    version = get_catalogue_version()
+    if resource_index.is_stale(version, getattr(settings, 'RESOURCE_INDEX_TTL', 60)):
+        resource_index.rebuild(Resource.objects.values_list('id', 'tags', 'language'), version)
+    return resource_index.recommend(mood, language, limit)
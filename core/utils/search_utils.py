@@ -0,0 +1,195 @@
+import re
+
+from django.db import connection
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Replace
+
+from core.models import ChatMessage, Resource
+
+# ✅ البحث النصي بـ SQLite FTS5.
+# unicode61 لا يزيل التشكيل العربي (يعامله كفاصل)، لذلك تحذفه الـ triggers بـ replace()
+# قبل الفهرسة. الـ triggers SQL عادي بدون دوال Python، فتعمل مع أي أداة تكتب في القاعدة
+# (sqlite3، dbshell ...) وتشمل bulk_create و update() والحذف المتسلسل بدون signals.
+# migration يعيد بناء أحد الجدولين في SQLite يحذف الـ triggers معه: ensure_search_index
+# تعيدها بعد كل migrate (post_migrate)، و rebuild_search_index يعيد البناء يدويًا.
+
+# التشكيل: تنوين، حركات، شدة، سكون، مدة، همزة فوق/تحت، ألف خنجرية
+SEARCH_DIACRITICS = ''.join(chr(code) for code in range(0x064B, 0x0656)) + '\u0670'
+_STRIP_DIACRITICS = str.maketrans('', '', SEARCH_DIACRITICS)
+# نفس فواصل unicode61: كل ما ليس حرفًا أو رقمًا (و _ منها)
+_SEPARATOR_RE = re.compile(r'[\W_]+')
+
+
+def _strip_diacritics_sql(column):
+    for mark in SEARCH_DIACRITICS:
+        column = f"replace({column}, '{mark}', '')"
+    return column
+
+
+def _resource_values(row):
+    return ', '.join(_strip_diacritics_sql(f'{row}{field}') for field in ('title', 'description', 'tags'))
+
+
+SEARCH_TABLES_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_resource_fts USING fts5(title, description, tags, tokenize='unicode61')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_chatmessage_fts USING fts5(content, tokenize='unicode61')",
+]
+
+SEARCH_TRIGGERS_SQL = {
+    'core_resource_fts_insert': f"""CREATE TRIGGER core_resource_fts_insert AFTER INSERT ON core_resource BEGIN
+        INSERT INTO core_resource_fts(rowid, title, description, tags) VALUES (new.id, {_resource_values('new.')});
+    END""",
+    'core_resource_fts_update': f"""CREATE TRIGGER core_resource_fts_update AFTER UPDATE OF title, description, tags ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+        INSERT INTO core_resource_fts(rowid, title, description, tags) VALUES (new.id, {_resource_values('new.')});
+    END""",
+    'core_resource_fts_delete': """CREATE TRIGGER core_resource_fts_delete AFTER DELETE ON core_resource BEGIN
+        DELETE FROM core_resource_fts WHERE rowid = old.id;
+    END""",
+    'core_chatmessage_fts_insert': f"""CREATE TRIGGER core_chatmessage_fts_insert AFTER INSERT ON core_chatmessage BEGIN
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, {_strip_diacritics_sql('new.content')});
+    END""",
+    'core_chatmessage_fts_update': f"""CREATE TRIGGER core_chatmessage_fts_update AFTER UPDATE OF content ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+        INSERT INTO core_chatmessage_fts(rowid, content) VALUES (new.id, {_strip_diacritics_sql('new.content')});
+    END""",
+    'core_chatmessage_fts_delete': """CREATE TRIGGER core_chatmessage_fts_delete AFTER DELETE ON core_chatmessage BEGIN
+        DELETE FROM core_chatmessage_fts WHERE rowid = old.id;
+    END""",
+}
+
+REBUILD_SEARCH_INDEX_SQL = [
+    "DELETE FROM core_resource_fts",
+    f"INSERT INTO core_resource_fts(rowid, title, description, tags) SELECT id, {_resource_values('')} FROM core_resource",
+    "DELETE FROM core_chatmessage_fts",
+    f"INSERT INTO core_chatmessage_fts(rowid, content) SELECT id, {_strip_diacritics_sql('content')} FROM core_chatmessage",
+]
+
+
+def rebuild_search_index(cursor):
+    """يعيد إنشاء الجداول والـ triggers ويعبئ الفهرس من الموارد والرسائل (داخل معاملة المستدعي)."""
+    for statement in SEARCH_TABLES_SQL:
+        cursor.execute(statement)
+    for name, statement in SEARCH_TRIGGERS_SQL.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(statement)
+    for statement in REBUILD_SEARCH_INDEX_SQL:
+        cursor.execute(statement)
+
+
+def ensure_search_index(using_connection):
+    """
+    يعيد بناء الفهرس إذا نقص أحد الـ triggers (مثلًا بعد migration أعاد بناء الجدول).
+    لا يفعل شيئًا قبل migration الفهرس أو خارج SQLite. يرجع True إذا أعاد البناء.
+    """
+    if using_connection.vendor != 'sqlite':
+        return False
+    with using_connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'core_%_fts%'")
+        existing = {name for (name,) in cursor.fetchall()}
+        if 'core_resource_fts' not in existing or existing.issuperset(SEARCH_TRIGGERS_SQL):
+            return False
+        rebuild_search_index(cursor)
+    return True
+
+
+def normalize_for_search(text):
+    """بدون تشكيل، وكل فاصل (رموز، _) مسافة، كما يقسم unicode61 النص المفهرس."""
+    return _SEPARATOR_RE.sub(' ', text.translate(_STRIP_DIACRITICS).lower()).strip() if text else ''
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """كل كلمة كبادئة ("كلمة"*) ومطلوبة كلها. يرجع '' إذا لم يبق شيء بعد التطبيع."""
+    return ' '.join(f'"{token}"*' for token in normalize_for_search(text).split())
+
+
+def _seek_sql(after):
+    # (rank, id) > (آخر rank، آخر id) — bm25 سالب والأفضل هو الأصغر
+    if after is None:
+        return '', []
+    return 'WHERE rank > %s OR (rank = %s AND id > %s)', [after[0], after[0], after[1]]
+
+
+def _ranked_objects(queryset, rows):
+    objects = queryset.in_bulk([object_id for object_id, _ in rows])
+    ranked = []
+    for object_id, rank in rows:
+        obj = objects.get(object_id)
+        if obj is not None:
+            obj.rank = rank
+            ranked.append(obj)
+    return ranked
+
+
+def _strip_diacritics(expression):
+    for mark in SEARCH_DIACRITICS:
+        expression = Replace(expression, Value(mark), output_field=TextField())
+    return expression
+
+
+def _fallback(queryset, fields, text, after, limit):
+    # قواعد بدون FTS5: نفس كلمات build_match_query، وكل كلمة يجب أن تظهر في أحد الحقول
+    # (بدون تشكيل كما في الفهرس). icontains مسح كامل بترتيب id، والـ rank ثابت 0
+    queryset = queryset.annotate(**{f'search_{field}': _strip_diacritics(F(field)) for field in fields})
+    for token in normalize_for_search(text).split():
+        matches = Q()
+        for field in fields:
+            matches |= Q(**{f'search_{field}__icontains': token})
+        queryset = queryset.filter(matches)
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after[1])
+    objects = list(queryset.order_by('pk')[:limit])
+    for obj in objects:
+        obj.rank = 0.0
+    return objects
+
+
+def search_resources(text, after=None, limit=20):
+    """موارد مرتبة بـ bm25 (العنوان أهم من الوسوم، والوسوم أهم من الوصف)."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    if not fts_available():
+        return _fallback(Resource.objects.all(), ('title', 'description', 'tags'), text, after, limit)
+
+    seek, seek_params = _seek_sql(after)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT id, rank FROM (
+                SELECT rowid AS id, bm25(core_resource_fts, 10.0, 1.0, 5.0) AS rank
+                FROM core_resource_fts WHERE core_resource_fts MATCH %s
+            ) {seek} ORDER BY rank, id LIMIT %s
+        """, [match, *seek_params, limit])
+        rows = cursor.fetchall()
+    return _ranked_objects(Resource.objects.all(), rows)
+
+
+def search_therapist_messages(therapist, text, session_id=None, after=None, limit=20):
+    """رسائل الجلسات التي يشرف عليها المعالج فقط، مرتبة بـ bm25."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    messages = ChatMessage.objects.filter(session__therapist=therapist)
+    if session_id is not None:
+        messages = messages.filter(session_id=session_id)
+    if not fts_available():
+        return _fallback(messages, ('content',), text, after, limit)
+
+    session_filter, session_params = ('AND m.session_id = %s', [session_id]) if session_id is not None else ('', [])
+    seek, seek_params = _seek_sql(after)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT id, rank FROM (
+                SELECT core_chatmessage_fts.rowid AS id, bm25(core_chatmessage_fts) AS rank
+                FROM core_chatmessage_fts
+                JOIN core_chatmessage m ON m.id = core_chatmessage_fts.rowid
+                JOIN core_session s ON s.id = m.session_id
+                WHERE core_chatmessage_fts MATCH %s AND s.therapist_id = %s {session_filter}
+            ) {seek} ORDER BY rank, id LIMIT %s
+        """, [match, therapist.pk, *session_params, *seek_params, limit])
+        rows = cursor.fetchall()
+    return _ranked_objects(messages, rows)
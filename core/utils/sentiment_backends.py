@@ -0,0 +1,170 @@
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .sentiment_utils import analyze_sentiment_scoring
+
+logger = logging.getLogger(__name__)
+
+
+class BaseSentimentBackend(ABC):
+    """واجهة محرك تحليل المشاعر: analyze(text) ترجع (mood, score)."""
+    name = None
+
+    @abstractmethod
+    def analyze(self, text):
+        """يرجع (mood, score) للنص."""
+
+
+class KeywordSentimentBackend(BaseSentimentBackend):
+    """التحليل بالقوائم (الافتراضي، وهو أيضًا البديل عند فشل أو بطء النموذج)."""
+    name = 'keywords'
+
+    def analyze(self, text):
+        return analyze_sentiment_scoring(text)
+
+
+class TransformerSentimentBackend(BaseSentimentBackend):
+    """
+    نموذج transformers محلي على الـ CPU يُحمّل مرة واحدة لكل عملية (worker).
+    الطلبات المتزامنة تُجمع في دفعات صغيرة (حتى max_batch_size أو حتى تنتهي
+    max_wait_ms)، وإذا تجاوز الرد latency_budget_ms نرجع لتحليل القوائم.
+    """
+    name = 'transformer'
+
+    DEFAULT_LABEL_MAP = {
+        'positive': 'happiness',
+        'negative': 'sadness',
+        'neutral': 'neutral',
+    }
+
+    def __init__(self, model, max_batch_size=16, max_wait_ms=10, latency_budget_ms=300,
+                 max_length=128, num_threads=None, label_map=None):
+        self.model_name = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.latency_budget = latency_budget_ms / 1000
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.label_map = {k.lower(): v for k, v in (label_map or self.DEFAULT_LABEL_MAP).items()}
+        self.fallback = KeywordSentimentBackend()
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._failed = False
+
+    def analyze(self, text):
+        self._ensure_worker()
+        if self._failed:
+            return self.fallback.analyze(text)
+
+        future = Future()
+        self._queue.put((text, future))
+        try:
+            result = future.result(timeout=self.latency_budget)
+        except TimeoutError:
+            future.cancel()
+            return self.fallback.analyze(text)
+        except Exception:
+            logger.exception("فشل تحليل الرسالة بالنموذج %s", self.model_name)
+            return self.fallback.analyze(text)
+        return result or self.fallback.analyze(text)
+
+    def _ensure_worker(self):
+        # الخيط لا ينتقل مع fork، لذلك نبدأ خيطًا جديدًا في كل عملية
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            self._failed = False
+            threading.Thread(target=self._run, args=(self._queue,), name='sentiment-batcher', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self, requests):
+        try:
+            self._load()
+        except Exception:
+            logger.exception("تعذر تحميل النموذج %s، سيتم استخدام تحليل القوائم", self.model_name)
+            self._failed = True
+            return
+
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # الطلبات التي انتهت مهلتها ألغيت، فلا داعي لتمريرها للنموذج
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self._predict([text for text, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _load(self):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self._model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        self._model.eval()
+
+    def _predict(self, texts):
+        """يشغّل النموذج على دفعة كاملة ويرجع (mood, score) أو None لكل نص."""
+        import torch
+
+        encoded = self._tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors='pt'
+        )
+        with torch.inference_mode():
+            probabilities = self._model(**encoded).logits.softmax(dim=-1)
+        scores, label_ids = probabilities.max(dim=-1)
+
+        results = []
+        for label_id, score in zip(label_ids.tolist(), scores.tolist()):
+            mood = self.label_map.get(self._model.config.id2label[label_id].lower())
+            # تصنيف غير معروف → None ليستخدم analyze البديل
+            results.append((mood, 0.0 if mood == 'neutral' else round(score, 2)) if mood else None)
+        return results
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_sentiment_backend():
+    """يرجع محرك التحليل المحدد في settings.SENTIMENT_BACKEND (نسخة واحدة لكل عملية)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = getattr(settings, 'SENTIMENT_BACKEND', {})
+                backend_class = import_string(
+                    config.get('BACKEND', 'core.utils.sentiment_backends.KeywordSentimentBackend')
+                )
+                _backend = backend_class(**config.get('OPTIONS', {}))
+    return _backend
@@ -1,4 +1,11 @@
-import re
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from .aho_corasick import AhoCorasick
+from .text_normalization import normalize_folded, normalize_text
 
 # ✅ قوائم الكلمات النهائية
 sadness_words = [
@@ -90,31 +97,117 @@ anger_words = [
 ]
 
 
-def normalize_text(text):
-    text = text.lower()
-    text = re.sub(r'[ًٌٍَُِّْ]', '', text)  # إزالة التشكيل
-    text = re.sub(r'[^\w\s]', '', text)    # إزالة الرموز
-    return text
+# ✅ وزن كل مزاج وقائمة كلماته (الترتيب يحدد الأولوية عند التعادل)
+MOOD_WEIGHTS = {"sadness": 3, "happiness": 1, "anxiety": 2, "anger": 2}
+MOOD_LEXICONS = {
+    "sadness": sadness_words,
+    "happiness": happiness_words,
+    "anxiety": anxiety_words,
+    "anger": anger_words,
+}
+
+
+class MoodMatcher:
+    """
+    يجمع كل قوائم المزاج في أوتوماتا واحدة، ولكل عبارة وزنها لكل مزاج.
+    العبارة المكررة في القائمة تُحسب بعدد تكرارها كما في الفحص القديم.
+    مع fold=True تمر العبارات والنص بنفس التوحيد (normalize_folded)، وإلا تُطابق العبارات كما هي.
+    version بصمة القوائم والأوزان والتوحيد (مفتاح كاش النتائج).
+    """
+
+    def __init__(self, lexicons, weights, fold=False):
+        self.moods = tuple(lexicons)
+        self.fold = fold
+        self.normalize = normalize_folded if fold else normalize_text
+        self.version = hashlib.sha1(json.dumps(
+            [fold, [(mood, weights[mood], list(lexicons[mood])) for mood in self.moods]], ensure_ascii=False
+        ).encode()).hexdigest()[:12]
+
+        pattern_weights = {}
+        for mood in self.moods:
+            for word in lexicons[mood]:
+                if fold:
+                    word = normalize_folded(word)
+                per_mood = pattern_weights.setdefault(word, {})
+                per_mood[mood] = per_mood.get(mood, 0) + weights[mood]
+
+        self._weights = tuple(tuple(per_mood.items()) for per_mood in pattern_weights.values())
+        self._automaton = AhoCorasick(pattern_weights)
+
+        # مصفوفة (عبارات × أمزجة) للتحليل الدفعي
+        self.weight_matrix = np.zeros((len(self._weights), len(self.moods)), dtype=np.int64)
+        for pattern_id, per_mood in enumerate(self._weights):
+            for mood, weight in per_mood:
+                self.weight_matrix[pattern_id, self.moods.index(mood)] = weight
+
+    def find(self, text):
+        return self._automaton.find(text)
+
+    def scores(self, text):
+        scores = dict.fromkeys(self.moods, 0)
+        for pattern_id in self._automaton.find(text):
+            for mood, weight in self._weights[pattern_id]:
+                scores[mood] += weight
+        return scores
+
+
+def _arabic_folding_enabled():
+    # الوحدة تعمل أيضًا بدون Django (benchmarks/bench_sentiment.py)
+    from django.conf import settings
+
+    return settings.configured and getattr(settings, 'SENTIMENT_ARABIC_FOLDING', False)
+
+
+# تُبنى مرة واحدة عند الاستيراد
+_mood_matcher = MoodMatcher(MOOD_LEXICONS, MOOD_WEIGHTS, fold=_arabic_folding_enabled())
+
+
+def configure_arabic_folding(fold):
+    """
+    يعيد بناء المطابق إذا اختلف التوحيد. للعمليات الفرعية (spawn) التي تستورد الوحدة
+    قبل تحميل إعدادات Django، فتُمرر لها القيمة من initializer.
+    """
+    global _mood_matcher
+    if _mood_matcher.fold != fold:
+        _mood_matcher = MoodMatcher(MOOD_LEXICONS, MOOD_WEIGHTS, fold=fold)
+
+# ✅ كاش LRU للرسائل القصيرة المتكررة (تحيات، "تمام"...): النص بعد التوحيد → (mood, score)
+SCORE_CACHE_SIZE = 4096
+SCORE_CACHE_MAX_LENGTH = 64  # الرسائل الأطول نادرًا ما تتكرر، فلا تُخزن
+
 
 def analyze_sentiment_scoring(text):
-    text = normalize_text(text)
-    scores = {"sadness": 0, "happiness": 0, "anxiety": 0, "anger": 0}
+    text = _mood_matcher.normalize(text)
+    if len(text) > SCORE_CACHE_MAX_LENGTH:
+        return _score_normalized(text)
+    return _cached_score(_mood_matcher.version, text)
+
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _cached_score(lexicon_version, text):
+    # lexicon_version جزء من المفتاح فقط: أي تغيير في القوائم أو التوحيد يعطي مفاتيح جديدة
+    return _score_normalized(text)
 
-    for word in sadness_words:
-        if word in text:
-            scores["sadness"] += 3
 
-    for word in happiness_words:
-        if word in text:
-            scores["happiness"] += 1
+def score_cache_stats():
+    info = _cached_score.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        "lexicon_version": _mood_matcher.version,
+    }
+
 
-    for word in anxiety_words:
-        if word in text:
-            scores["anxiety"] += 2
+def clear_score_cache():
+    _cached_score.cache_clear()
 
-    for word in anger_words:
-        if word in text:
-            scores["anger"] += 2
+
+def _score_normalized(text):
+    scores = _mood_matcher.scores(text)
 
     if all(score == 0 for score in scores.values()):
         return "neutral", 0.0
@@ -123,6 +216,51 @@ def analyze_sentiment_scoring(text):
     score = scores[dominant_mood] / max(10, sum(scores.values()))  # Normalize
     return dominant_mood, round(score, 2)
 
+
+def _round2(values):
+    """
+    نسخة vectorized من round(x, 2) تعطي نفس نتيجة بايثون تمامًا.
+    np.round يضرب في 100 فيخطئ في الحالات الحدية مثل 0.025، لذلك نحسب
+    خطأ الضرب بدقة (TwoProduct) ونحسم به الحالات القريبة من المنتصف.
+    """
+    scaled = values * 100.0
+    split = 134217729.0  # 2**27 + 1
+    big = split * values
+    hi = big - (big - values)
+    lo = values - hi
+    error = ((hi * 100.0 - scaled) + lo * 100.0)  # 100 يتمثل بدقة فلا يحتاج تقسيم
+
+    whole = np.floor(scaled)
+    frac = scaled - whole
+    round_up = (frac > 0.5) | ((frac == 0.5) & ((error > 0) | ((error == 0) & (whole % 2 == 1))))
+    return (whole + round_up) / 100.0
+
+
+def analyze_sentiment_batch(texts):
+    """
+    يحلل مجموعة نصوص دفعة واحدة ويرجع (moods, scores) كمصفوفتي NumPy
+    بنفس ترتيب المدخلات، وبنفس نتيجة analyze_sentiment_scoring لكل صف.
+    """
+    rows, pattern_ids = [], []
+    count = 0
+    for row, text in enumerate(texts):
+        found = _mood_matcher.find(_mood_matcher.normalize(text))
+        rows.extend([row] * len(found))
+        pattern_ids.extend(found)
+        count = row + 1
+
+    matrix = np.zeros((count, len(_mood_matcher.moods)), dtype=np.int64)
+    np.add.at(matrix, np.asarray(rows, dtype=np.intp), _mood_matcher.weight_matrix[np.asarray(pattern_ids, dtype=np.intp)])
+
+    totals = matrix.sum(axis=1)
+    dominant = matrix.argmax(axis=1)  # argmax يختار الأول عند التعادل مثل max على القاموس
+    scores = _round2(matrix[np.arange(count), dominant] / np.maximum(10, totals))
+
+    moods = np.array(_mood_matcher.moods + ("neutral",), dtype=object)
+    neutral = totals == 0
+    return moods[np.where(neutral, len(_mood_matcher.moods), dominant)], np.where(neutral, 0.0, scores)
+
+
 def generate_support_reply(mood):
     import random
 
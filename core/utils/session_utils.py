@@ -1,5 +1,64 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
+
+def get_session_idle_timeout():
+    return getattr(settings, 'SESSION_IDLE_TIMEOUT', timedelta(minutes=30))
+
+
+def is_session_idle(session, now=None):
+    """فحص رخيص بدون استعلام: هل تجاوزت الجلسة مدة الجمود؟"""
+    return (now or timezone.now()) - session.last_activity > get_session_idle_timeout()
+
 def refresh_session_activity(session):
     session.last_activity = timezone.now()
     session.save(update_fields=['last_activity'])
+
+
+async def arefresh_session_activity(session):
+    session.last_activity = timezone.now()
+    await session.asave(update_fields=['last_activity'])
+
+
+def touch_active_session(session_id, now=None):
+    """
+    يحدّث last_activity بـ UPDATE واحد فقط إذا كانت الجلسة ما زالت نشطة.
+    يرجع False إذا انتهت الجلسة (مثلاً بين القراءة والكتابة).
+    """
+    from core.models import Session
+
+    return Session.objects.filter(pk=session_id, is_active=True).update(
+        last_activity=now or timezone.now()
+    ) == 1
+
+
+def bump_messages_revision(session_ids):
+    """
+    يعلّم أن رسائل موجودة في هذه الجلسات تغيّرت (UPDATE واحد)، فيتغير ETag سجل الرسائل.
+    session_ids قائمة أو queryset من المعرفات.
+    """
+    from core.models import Session
+
+    return Session.objects.filter(pk__in=session_ids).update(messages_revision=F('messages_revision') + 1)
+
+
+def expire_idle_sessions(now=None):
+    """
+    ينهي كل الجلسات الخاملة بـ UPDATE واحد (يستخدم الفهرس الجزئي على last_activity).
+    آمن للتشغيل من أكثر من عملية بنفس الوقت. يرجع عدد الجلسات المنتهية.
+    """
+    from core.models import Session
+
+    from .metrics_utils import SESSIONS_ACTIVE, bump_metrics
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = Session.objects.filter(
+            is_active=True, last_activity__lt=now - get_session_idle_timeout()
+        ).update(is_active=False, end_time=now)
+        bump_metrics({(SESSIONS_ACTIVE, None): -expired})
+    return expired
@@ -0,0 +1,15 @@
+from django.conf import settings
+
+from .cache_utils import cached_with_stale_while_revalidate
+from .metrics_utils import read_platform_metrics
+
+PLATFORM_STATS_CACHE_KEY = 'platform-stats'
+
+
+def get_platform_stats():
+    return cached_with_stale_while_revalidate(
+        PLATFORM_STATS_CACHE_KEY,
+        read_platform_metrics,
+        ttl=getattr(settings, 'PLATFORM_STATS_CACHE_TTL', 30),
+        stale_ttl=getattr(settings, 'PLATFORM_STATS_STALE_TTL', 300),
+    )
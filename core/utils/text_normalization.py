@@ -0,0 +1,32 @@
+import re
+
+# ✅ الأنماط تُترجم مرة واحدة عند الاستيراد
+# التشكيل (ًٌٍَُِّْ) ليس من \w، فيُزال مع الرموز بنفس المرور
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+TATWEEL = 'ـ'
+
+# ✅ توحيد الحروف العربية: أشكال الألف، الألف المقصورة، التاء المربوطة، وحذف التطويل
+ARABIC_FOLDING = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+    TATWEEL: None,
+})
+
+
+def normalize_text(text):
+    """حروف صغيرة بدون تشكيل ولا رموز (نفس ناتج re.sub مرتين في النسخة القديمة)."""
+    return _NON_WORD_RE.sub('', text.lower())
+
+
+def fold_arabic(text):
+    return text.translate(ARABIC_FOLDING)
+
+
+def normalize_folded(text):
+    """normalize_text ثم التوحيد، في مرور واحد لكل خطوة."""
+    return _NON_WORD_RE.sub('', text.lower()).translate(ARABIC_FOLDING)
@@ -0,0 +1,58 @@
+import functools
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from rest_framework.exceptions import APIException
+
+
+class DatabaseBusy(APIException):
+    status_code = 503
+    default_detail = 'الخادم مشغول حاليًا، حاول مرة أخرى بعد قليل.'
+    default_code = 'database_busy'
+    wait = 1  # يضيف DRF ترويسة Retry-After
+
+
+_write_lock = threading.Lock()
+
+# أكواد SQLite الأساسية (الأكواد الموسعة مثل SQLITE_BUSY_SNAPSHOT بايتها الأدنى نفس الكود)
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_database_locked(exc):
+    """SQLITE_BUSY أو SQLITE_LOCKED فقط؛ بدون كود (خطأ غير صادر من sqlite3) نطابق رسالتي القفل."""
+    code = getattr(exc.__cause__, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    return str(exc).lower().startswith(LOCKED_MESSAGES)
+
+
+def serialized_write(func):
+    """
+    لمسارات الكتابة الكثيفة على SQLite:
+    - مع SQLITE_WRITE_QUEUE: كاتب واحد في كل عملية (قفل)، فخيوط نفس العملية لا تتنافس على قفل الملف.
+      المعاملة تبقى في خيط الطلب نفسه واتصاله.
+    - "database is locked" (بعد انتهاء busy timeout) يعاد حتى SQLITE_WRITE_RETRIES مرات بتأخير قصير،
+      وبعدها 503 مع Retry-After بدل 500.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # داخل معاملة خارجية لا يمكن إعادة المحاولة، والقفل موجود أصلًا
+        retries = 0 if connection.in_atomic_block else getattr(settings, 'SQLITE_WRITE_RETRIES', 3)
+        for attempt in range(retries + 1):
+            try:
+                if getattr(settings, 'SQLITE_WRITE_QUEUE', False):
+                    with _write_lock:
+                        return func(*args, **kwargs)
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_database_locked(exc):
+                    raise
+                if attempt == retries:
+                    raise DatabaseBusy() from exc
+                time.sleep(0.05 * 2 ** attempt * (1 + random.random()))
+    return wrapper
@@ -2,8 +2,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+import hashlib
 from datetime import timedelta
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
 from django.utils import timezone
+from django.db import transaction
 from django.db.utils import IntegrityError
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from drf_yasg.utils import swagger_auto_schema
@@ -11,24 +19,36 @@ from drf_yasg import openapi
 
 from .models import *
 from .serializers import (
-    UserRegistrationSerializer, SessionSerializer, ChatMessageSerializer,
-    AISuggestionSerializer, MoodLogSerializer, ResourceSerializer
+    UserRegistrationSerializer, SessionSerializer, ChatMessageSerializer, MoodLogSerializer, ResourceSerializer,
+    FastAISuggestionSerializer, FastChatMessageHistorySerializer, FastMoodLogSerializer, FastResourceSerializer
 )
-from .utils.sentiment_utils import analyze_sentiment_scoring, generate_support_reply
-from .utils.session_utils import refresh_session_activity
+from .utils.sentiment_utils import generate_support_reply, score_cache_stats
+from .utils.sentiment_backends import get_sentiment_backend
+from .utils.session_utils import is_session_idle, refresh_session_activity
+from .utils.chat_utils import save_chat_exchange
+from .utils.stats_utils import get_platform_stats
+from .utils.export_utils import EXPORT_SECTIONS, aiter_lines, iter_csv, iter_ndjson
+from .utils.resource_cache import CATALOGUE_FILTERS, catalogue_url, get_cached_catalogue
+from .utils.perf_utils import performance_registry, timed
+from .utils.search_utils import build_match_query, search_resources, search_therapist_messages
+from .utils.metrics_utils import read_metric_history
+from .pagination import KeysetPagination, SearchPagination
 from .permissions import IsClient, IsAdmin, IsTherapist, IsTherapistOrAdmin, IsSessionOwner, CanEditSession
 
 # ✅ تسجيل وعرض المستخدمين
 class UserProfileList(APIView):
+    keyset_ordering = ('-date_joined', '-id')
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [IsAdminUser()]
         return [AllowAny()]
 
     def get(self, request):
-        users = UserProfile.objects.all()
+        paginator = KeysetPagination()
+        users = paginator.paginate_queryset(UserProfile.objects.all(), request, view=self)
         serializer = UserRegistrationSerializer(users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
@@ -62,7 +82,7 @@ class SessionView(APIView):
         now = timezone.now()
 
         if active_session:
-            if now - active_session.last_activity > timedelta(minutes=30):
+            if is_session_idle(active_session, now):
                 active_session.is_active = False
                 active_session.end_time = now
                 active_session.save()
@@ -83,16 +103,13 @@ class SessionView(APIView):
         active_session = Session.objects.filter(user=request.user, is_active=True).first()
 
         if active_session:
-            if now - active_session.last_activity > timedelta(minutes=30):
+            if is_session_idle(active_session, now):
                 active_session.is_active = False
                 active_session.end_time = now
                 active_session.save()
-                new_session = Session.objects.create(
-                    user=request.user,
-                    start_time=now,
-                    is_active=True,
-                    is_ai_controlled=True
-                )
+                new_session = self._create_session(request, now)
+                if new_session is None:
+                    return self._already_active(request)
                 return Response({
                     'message': 'تم إنشاء جلسة جديدة بعد انتهاء القديمة بسبب الجمود.',
                     'session_id': new_session.id
@@ -105,16 +122,36 @@ class SessionView(APIView):
                     'session_id': active_session.id
                 }, status=status.HTTP_200_OK)
 
-        new_session = Session.objects.create(
-            user=request.user,
-            start_time=now,
-            is_active=True,
-            is_ai_controlled=True
-        )
+        new_session = self._create_session(request, now)
+        if new_session is None:
+            return self._already_active(request)
         return Response({
             'message': 'تم إنشاء جلسة جديدة.',
             'session_id': new_session.id
         }, status=status.HTTP_201_CREATED)
+
+    def _create_session(self, request, now):
+        # القيد one_active_session_per_user يرفض الجلسة الثانية عند الطلبات المتزامنة
+        try:
+            with transaction.atomic():
+                return Session.objects.create(
+                    user=request.user,
+                    start_time=now,
+                    is_active=True,
+                    is_ai_controlled=True
+                )
+        except IntegrityError:
+            return None
+
+    def _already_active(self, request):
+        active_session = Session.objects.filter(user=request.user, is_active=True).first()
+        if active_session is None:
+            # الجلسة التي سبقتنا انتهت قبل أن نقرأها
+            return Response({"message": "تعارض أثناء إنشاء الجلسة، حاول مرة أخرى."}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'message': 'الجلسة الحالية ما زالت نشطة.',
+            'session_id': active_session.id
+        }, status=status.HTTP_200_OK)
 class SessionDetailView(APIView):
     permission_classes = [IsSessionOwner | CanEditSession | IsAdmin]
 
@@ -127,7 +164,12 @@ class SessionDetailView(APIView):
         session = get_object_or_404(Session, pk=pk)
         serializer = SessionSerializer(session, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                # إعادة تفعيل جلسة قديمة بينما للمستخدم جلسة نشطة أخرى (one_active_session_per_user)
+                return Response({"message": "للمستخدم جلسة نشطة أخرى."}, status=status.HTTP_409_CONFLICT)
             return Response({
                 'message': 'تم تحديث الجلسة بنجاح.',
                 'data': serializer.data
@@ -146,6 +188,112 @@ class SessionDetailView(APIView):
 
     
 
+# ✅ سجل رسائل الجلسة مع جلب الجديد فقط (since_id / since_timestamp) و ETag
+class SessionMessagesView(APIView):
+    permission_classes = [IsAuthenticated & (IsSessionOwner | CanEditSession | IsAdmin)]
+    keyset_ordering = ('timestamp', 'id')
+
+    def get(self, request, pk):
+        session = get_object_or_404(Session, pk=pk)
+        self.check_object_permissions(request, session)
+        messages = ChatMessage.objects.filter(session=session)
+
+        # العدد وأكبر id (استعلام واحد على الفهرس) يكشفان الإضافة والحذف، و messages_revision
+        # يكشف تعديل رسائل موجودة (مثل rescore_sentiment). الـ ETag وحده يقرر، لأن Last-Modified بدقة ثانية
+        marker = messages.aggregate(count=Count('id'), latest_id=Max('id'))
+        query = hashlib.md5(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:8]
+        etag = (
+            f'"{session.pk}-{marker["count"]}-{marker["latest_id"] or 0}-{session.messages_revision}-{query}"'
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        since_id = request.query_params.get('since_id')
+        since_timestamp = request.query_params.get('since_timestamp')
+        if since_id:
+            if not since_id.isdigit():
+                return Response({"message": "since_id غير صالح."}, status=status.HTTP_400_BAD_REQUEST)
+            # نحوله إلى (timestamp, id) حتى يبقى البحث على فهرس (session, timestamp, id)
+            since_time = messages.filter(pk=since_id).values_list('timestamp', flat=True).first()
+            if since_time is None:
+                messages = messages.filter(pk__gt=since_id)
+            else:
+                messages = messages.filter(Q(timestamp__gt=since_time) | Q(timestamp=since_time, pk__gt=since_id))
+        elif since_timestamp:
+            since_time = parse_datetime(since_timestamp)
+            if since_time is None:
+                return Response({"message": "since_timestamp غير صالح."}, status=status.HTTP_400_BAD_REQUEST)
+            messages = messages.filter(timestamp__gt=since_time)
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(messages.values(*FastChatMessageHistorySerializer.fields()), request, view=self)
+        serializer = FastChatMessageHistorySerializer(page, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
+
+# ✅ تصدير بيانات المستخدم كاملة (لنفسه، أو لأي مستخدم للـ Admin عبر user_id)
+class UserDataExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        user_id = request.query_params.get('user_id')
+        if user_id:
+            if not request.user.is_staff:
+                return Response({"message": "غير مسموح بتصدير بيانات مستخدم آخر."}, status=status.HTTP_403_FORBIDDEN)
+            if not user_id.isdigit():
+                return Response({"message": "user_id غير صالح."}, status=status.HTTP_400_BAD_REQUEST)
+            user = get_object_or_404(UserProfile, pk=user_id)
+
+        # ?format محجوز في DRF لاختيار الـ renderer، لذلك output
+        output = request.query_params.get('output', 'ndjson')
+        sections = request.query_params.getlist('section')
+        if any(section not in EXPORT_SECTIONS for section in sections):
+            return Response({"message": "قسم غير معروف."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if output == 'csv':
+            if len(sections) != 1:
+                return Response({"message": "CSV يحتاج section واحد."}, status=status.HTTP_400_BAD_REQUEST)
+            lines, content_type = iter_csv(user, sections[0]), 'text/csv; charset=utf-8'
+            filename = f'daem-{user.pk}-{sections[0]}.csv'
+        elif output == 'ndjson':
+            lines, content_type = iter_ndjson(user, sections), 'application/x-ndjson; charset=utf-8'
+            filename = f'daem-{user.pk}.ndjson'
+        else:
+            return Response({"message": "output يجب أن يكون ndjson أو csv."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # تحت ASGI يُبث مولد async، وإلا يقرأ Django الملف كله في الذاكرة قبل الإرسال
+        if isinstance(request._request, ASGIRequest):
+            lines = aiter_lines(lines)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+# ✅ البحث في رسائل جلسات المعالج نفسه (Therapist فقط)
+class TherapistMessageSearchView(APIView):
+    permission_classes = [IsTherapist]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not build_match_query(query):
+            return Response({"message": "q مطلوب."}, status=status.HTTP_400_BAD_REQUEST)
+        session_id = request.query_params.get('session')
+        if session_id is not None and not session_id.isdigit():
+            return Response({"message": "session غير صالح."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = SearchPagination()
+        messages = paginator.paginate_search(
+            lambda after, limit: search_therapist_messages(
+                request.user, query, session_id=int(session_id) if session_id else None, after=after, limit=limit
+            ),
+            request,
+        )
+        serializer = FastChatMessageHistorySerializer(messages, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 # ✅ رسائل الشات (Client صاحب الجلسة أو Therapist أو Admin)
 class ChatMessageView(APIView):
     permission_classes = [IsSessionOwner | CanEditSession]
@@ -179,62 +327,21 @@ class ChatMessageView(APIView):
         serializer = ChatMessageSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=400)
-        session_id = request.data.get('session')
+        session = serializer.validated_data['session']
         content = request.data.get('content')
 
-        if not session_id or not content:
+        if not content:
             return Response({"message": "session_id و content مطلوبين."}, status=status.HTTP_400_BAD_REQUEST)
+        if not session.is_active:
+            raise Http404("No Session matches the given query.")
 
-        session = get_object_or_404(Session, id=session_id, is_active=True)
-        refresh_session_activity(session)
-
-        detected_mood ,sentiment_score = analyze_sentiment_scoring(content)
+        with timed('sentiment'):
+            detected_mood, sentiment_score = get_sentiment_backend().analyze(content)
         ai_response = generate_support_reply(detected_mood)
 
-        user_message = ChatMessage.objects.create(
-            session=session,
-            sender=request.user,
-            content=content,
-            is_ai=False,
-            sentiment=detected_mood
-        )
-
-        ai_user, created = UserProfile.objects.get_or_create(username='AI_Bot', defaults={
-            'email': 'ai@daem.com',
-            'role': 'therapist',
-            'is_verified': True
-        })
-
-        ai_message = ChatMessage.objects.create(
-            session=session,
-            sender=ai_user,
-            content=ai_response,
-            is_ai=True,
-            sentiment=detected_mood
-        )
-
-        if hasattr(session, 'mood_log'):
-    # ✅ موجود → نحدثه
-            mood_log = session.mood_log
-            mood_log.mood = detected_mood
-            mood_log.notes = f"تحديث المزاج أثناء الجلسة بناءً على الرسالة: {content[:30]}..."
-            mood_log.save()
-        else:
-            # ✅ ما في → ننشئ جديد
-            mood_log = MoodLog.objects.create(
-                user=request.user,
-                session=session,
-                mood=detected_mood,
-                notes=f"إنشاء المزاج الأول للجلسة بناءً على الرسالة: {content[:30]}...",
-                sentiment_score=sentiment_score
-            )
-
-
-        suggestion = AISuggestion.objects.create(
-            user=request.user,
-            mood_log=mood_log,
-            suggestion_text=ai_response,
-            source_type="chat"
+        # ✅ كل الكتابات في معاملة واحدة: تحديث النشاط، الرسالتين، سجل المزاج، التوصية
+        user_message, ai_message, mood_log, suggestion = save_chat_exchange(
+            request.user, session, content, detected_mood, sentiment_score, ai_response
         )
 
         return Response({
@@ -242,6 +349,7 @@ class ChatMessageView(APIView):
             'user_message': user_message.content,
             'ai_response': ai_response,
             'suggestion': suggestion.suggestion_text,
+            'resource': suggestion.resource_id,
             'detected_mood': detected_mood
         }, status=status.HTTP_201_CREATED)
 
@@ -250,9 +358,10 @@ class MoodLogListCreateView(APIView):
     permission_classes = [IsClient]
 
     def get(self, request):
-        logs = MoodLog.objects.filter(user=request.user)
-        serializer = MoodLogSerializer(logs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        logs = MoodLog.objects.filter(user=request.user).values(*FastMoodLogSerializer.fields())
+        serializer = FastMoodLogSerializer(paginator.paginate_queryset(logs, request, view=self), many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = MoodLogSerializer(data=request.data)
@@ -267,11 +376,13 @@ class MoodLogListCreateView(APIView):
 # ✅ التوصيات (Client فقط)
 class AISuggestionListView(APIView):
     permission_classes = [IsClient]
+    keyset_ordering = ('-generated_at', '-id')
 
     def get(self, request):
-        suggestions = AISuggestion.objects.filter(user=request.user)
-        serializer = AISuggestionSerializer(suggestions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        suggestions = AISuggestion.objects.filter(user=request.user).values(*FastAISuggestionSerializer.fields())
+        serializer = FastAISuggestionSerializer(paginator.paginate_queryset(suggestions, request, view=self), many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 # ✅ الموارد (الكل يستطيع القراءة، الإنشاء والتعديل Admin فقط)
 class ResourceListCreateView(APIView):
@@ -281,9 +392,24 @@ class ResourceListCreateView(APIView):
         return [AllowAny()]
 
     def get(self, request):
-        resources = Resource.objects.all()
-        serializer = ResourceSerializer(resources, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        filters = {field: request.query_params[field] for field in CATALOGUE_FILTERS if request.query_params.get(field)}
+        url = catalogue_url(request)
+
+        def build_page():
+            paginator = KeysetPagination()
+            paginator.base_url = url
+            resources = Resource.objects.filter(**filters).values(*FastResourceSerializer.fields())
+            serializer = FastResourceSerializer(paginator.paginate_queryset(resources, request, view=self), many=True)
+            return paginator.get_paginated_response(serializer.data).data
+
+        # المفتاح هو الرابط المطبّع (اللغة، التصنيف، المؤشر، حجم الصفحة)، وروابط next/previous مبنية عليه
+        data, etag = get_cached_catalogue(url, build_page)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = Response(data)
+        response['ETag'] = etag
+        return response
 
     def post(self, request):
         serializer = ResourceSerializer(data=request.data)
@@ -295,6 +421,21 @@ class ResourceListCreateView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# ✅ البحث في الموارد (FTS5، الكل يستطيع القراءة)
+class ResourceSearchView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not build_match_query(query):
+            return Response({"message": "q مطلوب."}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = SearchPagination()
+        resources = paginator.paginate_search(
+            lambda after, limit: search_resources(query, after=after, limit=limit), request
+        )
+        serializer = FastResourceSerializer(resources, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 class ResourceDetailView(APIView):
     permission_classes = [IsAdmin]
 
@@ -322,54 +463,32 @@ class PlatformStatsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        # عدد المستخدمين
-        total_users = UserProfile.objects.count()
-        total_clients = UserProfile.objects.filter(role='client').count()
-        total_therapists = UserProfile.objects.filter(role='therapist').count()
-
-        # عدد الجلسات
-        total_sessions = Session.objects.count()
-        active_sessions = Session.objects.filter(is_active=True).count()
-        completed_sessions = Session.objects.filter(is_completed=True).count()
-
-        # عدد الرسائل
-        total_messages = ChatMessage.objects.count()
-
-        # عدد سجلات المزاج
-        total_mood_logs = MoodLog.objects.count()
-
-        # عدد التوصيات
-        total_suggestions = AISuggestion.objects.count()
-
-        # عدد الموارد
-        total_resources = Resource.objects.count()
-
-        # تاريخ اليوم
-        today = timezone.now().date()
-
-        # جلسات اليوم
-        today_sessions = Session.objects.filter(start_time__date=today).count()
-
-        # إعداد الرد
-        data = {
-            "users": {
-                "total": total_users,
-                "clients": total_clients,
-                "therapists": total_therapists,
-            },
-            "sessions": {
-                "total": total_sessions,
-                "active": active_sessions,
-                "completed": completed_sessions,
-                "today": today_sessions,
-            },
-            "messages": total_messages,
-            "mood_logs": total_mood_logs,
-            "suggestions": total_suggestions,
-            "resources": total_resources,
-        }
+        # الأرقام من الكاش (تُحدّث في الخلفية بعد PLATFORM_STATS_CACHE_TTL ثانية)
+        data = get_platform_stats()
+
+        # ?days=30 → سلسلة يومية للرسم البياني من العدادات اليومية
+        days = request.query_params.get('days')
+        if days:
+            if not days.isdigit() or not 1 <= int(days) <= 365:
+                return Response({"message": "days يجب أن يكون بين 1 و 365."}, status=status.HTTP_400_BAD_REQUEST)
+            data = {**data, "history": read_metric_history(int(days))}
 
         return Response({
             "message": "تم جلب إحصائيات المنصة بنجاح.",
             "data": data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+# ✅ أزمنة الطلبات لكل مسار (p50/p95/p99) من PerformanceMiddleware، لهذه العملية فقط
+class PerformanceStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "enabled": settings.PERFORMANCE_MONITORING,
+            "routes": performance_registry.snapshot(),
+            "sentiment_cache": score_cache_stats(),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        performance_registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)